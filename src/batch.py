@@ -0,0 +1,192 @@
+"""
+Runs a solver over many input files in a process pool.
+
+The solver module has to define a top-level solve_file(file_path) function.
+Files are sent to the workers in chunks, results are streamed as the chunks complete,
+and a failing file doesn't stop the rest of the batch: its error is reported instead.
+A worker that dies (e.g. killed by OOM) fails only the chunk it was solving,
+the rest of the batch is resubmitted to a new pool.
+
+    python -m src.batch src.day_12_p3 "inputs/day_12/*.txt" --workers 8
+    python -m src.batch src.day_15_2 inputs/day_15 --chunk-size 32
+"""
+import argparse
+import glob
+import importlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional
+
+SolveFunc = Callable[[str], Any]
+
+# chunk states shared with the workers
+STARTED, DONE = 1, 2
+_chunk_states = None
+
+
+def find_inputs(pattern: str) -> List[str]:
+    # a folder (all the files in it) or a glob pattern
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*")
+    return sorted(p for p in glob.glob(pattern) if os.path.isfile(p))
+
+
+def _solve_chunk(solve_file: SolveFunc, file_paths: List[str]) -> List[Dict[str, Any]]:
+    results = []
+    for file_path in file_paths:
+        result: Dict[str, Any] = {"file": file_path}
+        started = time.perf_counter()
+        try:
+            # solvers print a lot, the output of thousands of them is of no use
+            with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                answer = solve_file(file_path)
+            result["answer"] = answer if isinstance(answer, (int, str)) or answer is None else str(answer)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["seconds"] = round(time.perf_counter() - started, 6)
+        results.append(result)
+    return results
+
+
+def _init_worker(states) -> None:
+    global _chunk_states
+    _chunk_states = states
+
+
+def _solve_tracked_chunk(solve_file: SolveFunc, index: int, file_paths: List[str]) -> List[Dict[str, Any]]:
+    # the shared state tells the parent which chunks a worker was busy with when the pool broke
+    _chunk_states[index] = STARTED
+    results = _solve_chunk(solve_file, file_paths)
+    _chunk_states[index] = DONE
+    return results
+
+
+def _run_chunks(chunks: List[List[str]],
+                indices: List[int],
+                solve_file: SolveFunc,
+                workers: Optional[int],
+                states) -> Generator[Dict[str, Any], None, List[int]]:
+    # yields the results of the chunks, returns the indices of the ones lost to a broken pool
+    broken = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(states,)) as executor:
+        futures = {}
+        for n, index in enumerate(indices):
+            try:
+                futures[executor.submit(_solve_tracked_chunk, solve_file, index, chunks[index])] = index
+            except BrokenProcessPool:
+                # the pool broke while the chunks were still being submitted
+                broken.extend(indices[n:])
+                break
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results = future.result()
+            except BrokenProcessPool:
+                broken.append(index)
+                continue
+            except Exception as e:
+                results = [{"file": f, "error": f"{type(e).__name__}: {e}"} for f in chunks[index]]
+            yield from results
+    return broken
+
+
+def run_batch(file_paths: List[str],
+              solve_file: SolveFunc,
+              workers: Optional[int] = None,
+              chunk_size: int = 8) -> Iterator[Dict[str, Any]]:
+    """
+    yields {"file": ..., "answer": ..., "seconds": ...} (or "error" instead of "answer")
+    per input file, in the order of completion
+    """
+    chunks = [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+    states = multiprocessing.Array("b", len(chunks), lock=False)
+    pending = list(range(len(chunks)))
+    while pending:
+        broken = yield from _run_chunks(chunks, pending, solve_file, workers, states)
+        # a dead worker (e.g. killed by OOM) breaks the whole pool, so every unfinished chunk fails.
+        # The ones that hadn't started go back to a new pool, the ones that were running
+        # are rerun one per pool, so only the chunk that kills its worker is reported
+        running = [i for i in broken if states[i] == STARTED]
+        pending = [i for i in broken if states[i] != STARTED]
+        if broken and not running:
+            # the pool broke before any chunk started, retrying would break it again
+            running, pending = broken, []
+        for index in running:
+            if (yield from _run_chunks(chunks, [index], solve_file, 1, states)):
+                yield from ({"file": f, "error": "BrokenProcessPool: the worker died"} for f in chunks[index])
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.batch")
+    parser.add_argument("module", help="solver module with a solve_file() function, e.g. src.day_12_p3")
+    parser.add_argument("inputs", help="folder or glob pattern of the input files")
+    parser.add_argument("--workers", type=int, help="number of processes, CPU count by default")
+    parser.add_argument("--chunk-size", type=int, default=8, help="files per task sent to a worker")
+    options = parser.parse_args(args)
+
+    solve_file = importlib.import_module(options.module).solve_file
+    failed = 0
+    # one JSON line per file, as soon as it's solved
+    for result in run_batch(find_inputs(options.inputs), solve_file, options.workers, options.chunk_size):
+        failed += "error" in result
+        print(json.dumps(result), flush=True)
+    if failed:
+        raise SystemExit(f"{failed} file(s) failed")
+
+
+def test_run_batch():
+    import tempfile
+
+    from src.day_15_2 import solve_file
+
+    with tempfile.TemporaryDirectory() as folder:
+        steps = {"a.txt": "rn=1,cm-,qp=3", "b.txt": "ab=x", "c.txt": "rn=1,cm=2"}
+        for name, text in steps.items():
+            with open(os.path.join(folder, name), "w") as f:
+                f.write(text + "\n")
+        file_paths = find_inputs(folder)
+        assert [os.path.basename(p) for p in file_paths] == ["a.txt", "b.txt", "c.txt"]
+        assert find_inputs(os.path.join(folder, "[ac].txt")) == [file_paths[0], file_paths[2]]
+
+        results = {os.path.basename(r["file"]): r for r in run_batch(file_paths, solve_file, 2, 2)}
+        # the malformed file is reported, the rest of the batch is still solved
+        assert "error" in results["b.txt"] and "answer" not in results["b.txt"]
+        assert results["a.txt"]["answer"] == 1 * 1 + 2 * 3
+        assert results["c.txt"]["answer"] == 1 * 1 + 1 * 2 * 2
+
+
+def _solve_or_crash(file_path: str) -> int:
+    # kills the worker on "crash" files, the way the OOM killer does
+    if "crash" in os.path.basename(file_path):
+        os._exit(1)
+    return os.path.getsize(file_path)
+
+
+def test_run_batch_worker_crash():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as folder:
+        names = ["f1.txt", "f2.txt", "f3_crash.txt", "f4.txt", "f5.txt", "f6.txt"]
+        for name in names:
+            with open(os.path.join(folder, name), "w") as f:
+                f.write(name)
+        results = {os.path.basename(r["file"]): r for r in run_batch(find_inputs(folder), _solve_or_crash, 2, 1)}
+        assert sorted(results) == names
+        assert "BrokenProcessPool" in results["f3_crash.txt"]["error"]
+        for name in names:
+            if name != "f3_crash.txt":
+                assert results[name]["answer"] == len(name)
+
+
+def test_all():
+    test_run_batch()
+    test_run_batch_worker_crash()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Benchmarks the solvers on synthetic inputs of growing size (see src/synthetic.py)
+and reports the throughput curve per day. The "exp" column is the empirical scaling
+exponent between two consecutive scales: ~1 is linear, ~2 is quadratic, etc.
+
+    python -m src.bench
+    python -m src.bench --day 22 --scales 1,10,100 --output bench.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src import file_path as file_path_module
+from src.synthetic import write_input
+
+# solvers might recurse as deep as the input is long
+sys.setrecursionlimit(100000)
+
+# exponents above this value are reported as super-linear
+SUPER_LINEAR_EXPONENT = 1.3
+
+BenchFunc = Callable[[str], Any]
+
+# (day, variant) -> (input kind, solver); variants compare implementations of the same day
+BENCHMARKS: Dict[Tuple[int, str], Tuple[str, BenchFunc]] = {}
+
+
+def benchmark(day: int, kind: str, variant: str = "") -> Callable[[BenchFunc], BenchFunc]:
+    def register(func: BenchFunc) -> BenchFunc:
+        BENCHMARKS[(day, variant)] = (kind, func)
+        return func
+
+    return register
+
+
+@benchmark(10, "maze")
+def bench_day_10(file_path: str) -> Any:
+    from src.day_10_2 import PackedMaze
+
+    return PackedMaze(file_path).count_inner_dots()
+
+
+@benchmark(14, "dish", "numpy")
+def bench_day_14(file_path: str) -> Any:
+    from src.day_14_2 import NumpyPanel
+
+    panel = NumpyPanel(file_path)
+    panel.spin(10)
+    return panel.load()
+
+
+@benchmark(14, "dish", "bits")
+def bench_day_14_bits(file_path: str) -> Any:
+    from src.day_14_2 import BitPanel
+
+    panel = BitPanel(file_path)
+    panel.spin(10)
+    return panel.load()
+
+
+@benchmark(14, "dish", "lists")
+def bench_day_14_lists(file_path: str) -> Any:
+    from src.day_14_2 import ControlPanel
+
+    panel = ControlPanel(file_path)
+    for _ in range(4 * 10):
+        panel.move()
+    return panel.solve()
+
+
+@benchmark(16, "contraption")
+def bench_day_16(file_path: str) -> Any:
+    from src.day_16_1 import Machine, Beam
+
+    return Machine(file_path).trace_and_calc(Beam(0, 0, 1, 0))
+
+
+@benchmark(17, "heat_map")
+def bench_day_17(file_path: str) -> Any:
+    from src.day_17_2 import HeatMap
+
+    return HeatMap(file_path).find_way()
+
+
+@benchmark(20, "netlist")
+def bench_day_20(file_path: str) -> Any:
+    from src.day_20_3 import Circuit
+
+    circuit = Circuit()
+    circuit.load_from_file(file_path)
+    for _ in range(100):
+        circuit.press_button()
+    return circuit.ticks
+
+
+@benchmark(21, "garden")
+def bench_day_21(file_path: str) -> Any:
+    from src.day_21_1 import FieldMap
+
+    field_map = FieldMap()
+    field_map.load_from_file(file_path)
+    return field_map.solve()
+
+
+@benchmark(22, "bricks")
+def bench_day_22(file_path: str) -> Any:
+    from src.day_22_2 import Jenga
+
+    jenga = Jenga(file_path)
+    jenga.zip_bricks()
+    return jenga.calc_max_impact()
+
+
+@benchmark(23, "hiking_map")
+def bench_day_23(file_path: str) -> Any:
+    from src.day_23_2 import Island
+
+    return Island(file_path).solve()
+
+
+@benchmark(24, "hailstones")
+def bench_day_24(file_path: str) -> Any:
+    from src.day_24_1 import Hail
+
+    return Hail(file_path).solve()
+
+
+@benchmark(25, "wiring")
+def bench_day_25(file_path: str) -> Any:
+    from src.day_25.day_25_greedy import Graph
+
+    random.seed(0)
+    graph = Graph()
+    graph.load_from_file(file_path)
+    return graph.find_min_cut()
+
+
+def _run_cold(func: BenchFunc, file_path: str, folder: str) -> float:
+    # every run gets an empty parse cache, so all the scales are timed parsing, not unpickling
+    cache_path = file_path_module.CACHE_PATH
+    file_path_module.set_cache_path(tempfile.mkdtemp(prefix="cache_", dir=folder))
+    try:
+        started = time.perf_counter()
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            func(file_path)
+        return time.perf_counter() - started
+    finally:
+        file_path_module.set_cache_path(cache_path)
+
+
+def run_benchmark(day: int, scales: List[int], folder: str, repeat: int = 1,
+                  variant: str = "") -> List[Dict[str, Any]]:
+    kind, func = BENCHMARKS[(day, variant)]
+    records: List[Dict[str, Any]] = []
+    # warm up: the first run pays for the imports
+    _run_cold(func, write_input(folder, kind, min(scales)), folder)
+    for scale in scales:
+        file_path = write_input(folder, kind, scale)
+        seconds = min(_run_cold(func, file_path, folder) for _ in range(repeat))
+        record = {
+            "day": day,
+            "variant": variant,
+            "scale": scale,
+            "input_bytes": os.path.getsize(file_path),
+            "seconds": round(seconds, 6),
+            "scale_per_second": round(scale / seconds, 3) if seconds else None,
+            "exponent": None,
+        }
+        if records and records[-1]["seconds"] and seconds:
+            prev = records[-1]
+            record["exponent"] = round(math.log(seconds / prev["seconds"]) / math.log(scale / prev["scale"]), 2)
+        records.append(record)
+    return records
+
+
+def print_records(records: List[Dict[str, Any]]) -> None:
+    print(f"{'day':>4} {'variant':>8} {'scale':>6} {'bytes':>10} {'seconds':>10} {'scale/s':>10} {'exp':>6}")
+    for r in records:
+        exponent = "" if r["exponent"] is None else f"{r['exponent']:.2f}"
+        if r["exponent"] is not None and r["exponent"] > SUPER_LINEAR_EXPONENT:
+            exponent += " !"
+        print(f"{r['day']:>4} {r['variant']:>8} {r['scale']:>6} {r['input_bytes']:>10} {r['seconds']:>10.4f} "
+              f"{r['scale_per_second'] or 0:>10.2f} {exponent:>6}")
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.bench")
+    parser.add_argument("--day", type=int, action="append", help="day to benchmark, could be repeated")
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated input size multipliers")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scale, the best time is reported")
+    parser.add_argument("--output", help="store the records as JSON")
+    options = parser.parse_args(args)
+
+    scales = [int(s) for s in options.scales.split(",")]
+    records: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as folder:
+        for day, variant in sorted(BENCHMARKS):
+            if options.day and day not in options.day:
+                continue
+            day_records = run_benchmark(day, scales, folder, options.repeat, variant)
+            print_records(day_records)
+            records += day_records
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(records, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 from typing import TypeAlias, Tuple, Dict, List, Set
 
+import numpy as np
+
+from src.file_path import data_path, read_grid
+
 Cell: TypeAlias = Tuple[bool, bool, bool, bool]  # l, u, r, d
 
 """
@@ -49,6 +53,9 @@ class Maze:
         (True, True, True, True): "╬"
     }
 
+    # (row, column) steps in the cell's l, u, r, d order
+    DIRECTIONS: Tuple[Tuple[int, int], ...] = ((0, -1), (-1, 0), (0, 1), (1, 0))
+
     VERT_BLOCKERS = {
         (False, True, False, True),  # "|"
         (False, True, True, False),  # "└"
@@ -91,6 +98,69 @@ class Maze:
         self._print_nice_looking(paths, set(insider_points))
         print(f"Total: {count_total} spots, out of them {count_inside} are inside the path")
 
+    def count_inner_dots(self) -> int:
+        # the original calc_inner_dots() without the wave: O(loop length) + one pass per row
+        loop = self.trace_loop()
+        inside = self.find_inside(loop)
+        self._print_nice_looking(set(loop), inside)
+        print(f"Total: {self.H * self.W - len(loop)} spots, out of them {len(inside)} are inside the path")
+        return len(inside)
+
+    def trace_loop(self) -> List[Tuple[int, int]]:
+        """
+        follows the pipe from S once, returns the loop cells in the walking order, S first.
+        Every pipe has two ends: leave a cell through the one we didn't come in from
+        """
+        start_cell = self.grid[self.start[0]][self.start[1]]
+        # S might connect to more than two pipes, some of them lead to dead ends
+        for first_direction in [d for d in range(4) if start_cell[d]]:
+            direction = first_direction
+            loop = [self.start]
+            i, j = self.start
+            while direction is not None:
+                i, j = i + self.DIRECTIONS[direction][0], j + self.DIRECTIONS[direction][1]
+                if (i, j) == self.start:
+                    return loop
+                loop.append((i, j))
+                came_from = (direction + 2) % 4
+                cell = self.grid[i][j]
+                direction = next((d for d in range(4) if cell[d] and d != came_from), None)
+        raise ValueError(f"no loop through S at {self.start}")
+
+    def find_inside(self, loop: List[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        """
+        scanline parity: walking a row left to right, every loop cell going up (|, L, J)
+        flips inside/outside. The loop's own steps say which cells go up, S included
+        """
+        goes_up = set()
+        for k, (i, j) in enumerate(loop):
+            next_i, next_j = loop[(k + 1) % len(loop)]
+            if next_j == j:
+                goes_up.add((max(i, next_i), j))
+        loop_cells = set(loop)
+        rows: Dict[int, List[int]] = {}
+        for i, j in loop_cells:
+            rows.setdefault(i, []).append(j)
+
+        inside: Set[Tuple[int, int]] = set()
+        for i, columns in rows.items():
+            is_inside = False
+            columns.sort()
+            for left, right in zip(columns, columns[1:]):
+                is_inside ^= (i, left) in goes_up
+                if is_inside:
+                    inside.update((i, j) for j in range(left + 1, right) if (i, j) not in loop_cells)
+        return inside
+
+    @classmethod
+    def count_inside_by_area(cls, loop: List[Tuple[int, int]]) -> int:
+        # shoelace area of the loop, then Pick's theorem: A = inside + boundary / 2 - 1
+        doubled_area = 0
+        for k, (i, j) in enumerate(loop):
+            next_i, next_j = loop[(k + 1) % len(loop)]
+            doubled_area += j * next_i - next_j * i
+        return (abs(doubled_area) - len(loop)) // 2 + 1
+
     def _is_inside(self, y: int, x: int, paths: Set[Tuple[int, int]]) -> bool:
         crossings = 0
         for j in range(x + 1, self.W):
@@ -281,6 +351,142 @@ class Maze:
         self.grid = tuple(new_rows)
 
 
+# a cell as a bitmask of its connections, in the Cell order
+LEFT, UP, RIGHT, DOWN = 1, 2, 4, 8
+
+
+def cell_to_bits(cell: Cell) -> int:
+    return sum(1 << i for i, connected in enumerate(cell) if connected)
+
+
+def symbol_table(cell_to_smb: Dict[Cell, str]) -> np.ndarray:
+    table = np.array(["?"] * 16, dtype=object)
+    for cell, smb in cell_to_smb.items():
+        table[cell_to_bits(cell)] = smb
+    return table
+
+
+class PackedMaze:
+    """
+    the same maze as numpy arrays: connections as a uint8 bitmask per cell (1 byte instead of
+    a tuple of 4 bools), distances along the loop as int32 and the loop / inside as bool masks
+    """
+    # symbol byte -> connection bits
+    SYMBOL_BITS = np.zeros(256, dtype=np.uint8)
+    SYMBOL_BITS[[ord(smb) for smb in Maze.SMB_TO_CELL]] = [cell_to_bits(c) for c in Maze.SMB_TO_CELL.values()]
+
+    # connection bits -> rendered symbol, "?" for the shapes no pipe has
+    NICE_SYMBOLS = symbol_table(Maze.NICE_SMB_TO_CELL)
+    DOUBLE_LINED_SYMBOLS = symbol_table(Maze.DOUBLE_LINED_SMB_TO_CELL)
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        symbols = read_grid(file_path)
+        self.H, self.W = symbols.shape
+        start = int(np.flatnonzero(symbols == ord("S"))[0])
+        self.start = divmod(start, self.W)
+        self.orig_connections: np.ndarray = self.SYMBOL_BITS[symbols]
+        self.connections = self._fix_mutual_connections(self.orig_connections)
+        # -1 for the cells off the loop
+        self.distance = np.full((self.H, self.W), -1, dtype=np.int32)
+        self.loop = np.zeros((self.H, self.W), dtype=bool)
+        self.inside = np.zeros((self.H, self.W), dtype=bool)
+
+    @classmethod
+    def _fix_mutual_connections(cls, connections: np.ndarray) -> np.ndarray:
+        # a connection stays if the neighbour connects back, nothing leads out of the grid
+        fixed = connections.copy()
+        back = np.zeros_like(connections)
+        back[:, 1:] |= np.where(connections[:, :-1] & RIGHT, LEFT, 0).astype(np.uint8)
+        back[1:, :] |= np.where(connections[:-1, :] & DOWN, UP, 0).astype(np.uint8)
+        back[:, :-1] |= np.where(connections[:, 1:] & LEFT, RIGHT, 0).astype(np.uint8)
+        back[:-1, :] |= np.where(connections[1:, :] & UP, DOWN, 0).astype(np.uint8)
+        fixed &= back
+        return fixed
+
+    def trace_loop(self) -> np.ndarray:
+        """
+        flat indices of the loop cells in the walking order, S first; fills distance and loop.
+        Same as Maze.trace_loop(), with the steps as flat offsets
+        """
+        steps = (-1, -self.W, 1, self.W)
+        start = self.start[0] * self.W + self.start[1]
+        flat = self.connections.ravel()
+        for first_direction in [d for d in range(4) if flat[start] >> d & 1]:
+            direction = first_direction
+            loop = [start]
+            index = start
+            while direction is not None:
+                index += steps[direction]
+                if index == start:
+                    indices = np.array(loop, dtype=np.int64)
+                    walked = np.arange(len(loop), dtype=np.int32)
+                    self.distance.ravel()[indices] = np.minimum(walked, len(loop) - walked)
+                    self.loop.ravel()[indices] = True
+                    return indices
+                loop.append(index)
+                bits = int(flat[index]) & ~(1 << (direction + 2) % 4)
+                direction = bits.bit_length() - 1 if bits else None
+        raise ValueError(f"no loop through S at {self.start}")
+
+    def find_inside(self, loop: np.ndarray) -> np.ndarray:
+        # scanline parity for all the rows at once: a running count of the loop cells going up
+        following = np.roll(loop, -1)
+        vertical = np.abs(loop - following) == self.W
+        goes_up = np.zeros(self.H * self.W, dtype=np.uint8)
+        goes_up[np.maximum(loop, following)[vertical]] = 1
+        crossings = np.cumsum(goes_up.reshape(self.H, self.W), axis=1, dtype=np.int32)
+        self.inside = (crossings & 1).astype(bool) & ~self.loop
+        return self.inside
+
+    def count_inner_dots(self, print_paths: bool = False) -> int:
+        # print_paths renders the maze to a "_paths.txt" file next to the input
+        self.find_inside(self.trace_loop())
+        if print_paths:
+            self._print_nice_looking()
+        count_inside = int(self.inside.sum())
+        print(f"Total: {self.H * self.W - int(self.loop.sum())} spots, out of them {count_inside} are inside the path")
+        return count_inside
+
+    def _print_nice_looking(self) -> None:
+        # a row at a time, the symbols of the whole maze would take more memory than the maze itself
+        new_path = f"{self.file_path.replace('.txt', '_paths.txt')}"
+        with open(new_path, 'w') as file:
+            for i, connections in enumerate(self.orig_connections):
+                symbols = np.where(self.loop[i], self.DOUBLE_LINED_SYMBOLS[connections], self.NICE_SYMBOLS[connections])
+                symbols[self.inside[i]] = "*"
+                if i == self.start[0]:
+                    symbols[self.start[1]] = "S"
+                file.write("".join(symbols))
+                file.write('\n')
+
+
+def test_packed_maze():
+    for file_name, farthest in [("input_d10_1_small.txt", 4), ("input_d10_small_2.txt", 8)]:
+        maze = PackedMaze(data_path(file_name))
+        maze.trace_loop()
+        assert maze.distance.max() == farthest, file_name
+    for file_name in ["input_d10_small_3.txt", "input_d10_small_4.txt"]:
+        maze, packed = Maze(data_path(file_name)), PackedMaze(data_path(file_name))
+        assert packed.connections.tolist() == [[cell_to_bits(c) for c in row] for row in maze.grid]
+        loop = maze.trace_loop()
+        packed.find_inside(packed.trace_loop())
+        assert set(zip(*np.nonzero(packed.inside))) == maze.find_inside(loop), file_name
+
+
+def test_trace_loop():
+    for file_name, inside in [("input_d10_1_small.txt", 1), ("input_d10_small_2.txt", 1),
+                              ("input_d10_small_3.txt", 8), ("input_d10_small_4.txt", 10)]:
+        maze = Maze(data_path(file_name))
+        loop = maze.trace_loop()
+        assert len(maze.find_inside(loop)) == maze.count_inside_by_area(loop) == inside, file_name
+
+
+def test_all():
+    test_trace_loop()
+    test_packed_maze()
+
+
 if __name__ == "__main__":
     # Total: 2515 spots, out of them 1109 are inside the path  -> too high
     # Total: 2515 spots, out of them 217 are inside the path  -> too low
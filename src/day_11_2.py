@@ -1,5 +1,10 @@
 import math
-from typing import List, Tuple, Any, TypeAlias
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import List, Tuple, Any, TypeAlias, Iterable, Set
+
+from src.file_path import data_path
 
 Cell: TypeAlias = Tuple[int, int]
 
@@ -12,6 +17,8 @@ class GalaxyObserver:
         self.map: Tuple[Tuple[int]] = ()
         self.row_weights: Tuple[int] = ()
         self.col_weights: Tuple[int] = ()
+        self.empty_rows: Tuple[int] = ()
+        self.empty_columns: Tuple[int] = ()
         self._init_map()
 
     def calc_total_distance(self) -> int:
@@ -25,16 +32,31 @@ class GalaxyObserver:
         print(f"Total distance: {total_distance}")
         return total_distance
 
+    def calc_total_distances(self, inflate_rates: Iterable[int]) -> List[int]:
+        """
+        the total distance for every inflate rate, O(G log G) for all of them:
+        a galaxy's inflated coordinate is coord + (rate - 1) * (empty lines before it),
+        so the total is linear in the rate: plain total + (rate - 1) * total over the empty lines
+        """
+        galaxies = self._get_galaxy_coords()
+        empty_rows, empty_columns = set(self.empty_rows), set(self.empty_columns)
+        empty_rows_before = list(accumulate((1 if i in empty_rows else 0 for i in range(self.h)), initial=0))
+        empty_cols_before = list(accumulate((1 if i in empty_columns else 0 for i in range(self.w)), initial=0))
+        plain = sum_pairwise_distances([y for y, _x in galaxies]) + sum_pairwise_distances([x for _y, x in galaxies])
+        empty = (sum_pairwise_distances([empty_rows_before[y] for y, _x in galaxies]) +
+                 sum_pairwise_distances([empty_cols_before[x] for _y, x in galaxies]))
+        return [plain + (rate - 1) * empty for rate in inflate_rates]
+
     def _get_dist_between_galaxies(self, galaxy1: Cell, galaxy2: Cell) -> int:
         dist = 0
-        start_x, end_x = min(galaxy1[0], galaxy2[0]), max(galaxy1[0], galaxy2[0])
-        for x in range(start_x + 1, end_x):
-            dist += self.col_weights[x]
-
-        start_y, end_y = min(galaxy1[1], galaxy2[1]), max(galaxy1[1], galaxy2[1])
-        for y in range(start_y + 1, end_y):
+        start_y, end_y = min(galaxy1[0], galaxy2[0]), max(galaxy1[0], galaxy2[0])
+        for y in range(start_y + 1, end_y + 1):
             dist += self.row_weights[y]
 
+        start_x, end_x = min(galaxy1[1], galaxy2[1]), max(galaxy1[1], galaxy2[1])
+        for x in range(start_x + 1, end_x + 1):
+            dist += self.col_weights[x]
+
         return dist
 
     def _get_galaxy_coords(self) -> List[Cell]:  # (row, col)
@@ -63,6 +85,8 @@ class GalaxyObserver:
 
         self.col_weights = tuple(col_weights)
         self.row_weights = tuple(row_weights)
+        self.empty_columns = tuple(empty_columns)
+        self.empty_rows = tuple(empty_rows)
 
     def _read_file(self) -> List[List[str]]:
         with open(self.path_to_file, 'r') as file:
@@ -72,7 +96,93 @@ class GalaxyObserver:
         return lines
 
 
+class SparseGalaxies:
+    """
+    only the galaxies of the map, read line by line: memory grows with the galaxy count,
+    not with the map area. Empty lines before a galaxy are its coordinate minus
+    the occupied lines before it, counted on the fly for rows and by bisect for columns
+    """
+
+    def __init__(self) -> None:
+        self.w = 0
+        self.h = 0
+        self.rows = array("q")
+        self.cols = array("q")
+        # empty rows above each galaxy
+        self.empty_rows_before = array("q")
+        self.occupied_columns: Set[int] = set()
+
+    @classmethod
+    def from_file(cls, path_to_file: str) -> "SparseGalaxies":
+        with open(path_to_file, 'r') as file:
+            return cls.from_lines(file)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "SparseGalaxies":
+        galaxies = cls()
+        occupied_rows = 0
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            galaxies.w = max(galaxies.w, len(line))
+            y = galaxies.h
+            galaxies.h += 1
+            x = line.find("#")
+            if x < 0:
+                continue
+            empty_rows = y - occupied_rows
+            occupied_rows += 1
+            while x >= 0:
+                galaxies.rows.append(y)
+                galaxies.cols.append(x)
+                galaxies.empty_rows_before.append(empty_rows)
+                galaxies.occupied_columns.add(x)
+                x = line.find("#", x + 1)
+        return galaxies
+
+    def calc_total_distances(self, inflate_rates: Iterable[int]) -> List[int]:
+        # same as GalaxyObserver.calc_total_distances()
+        occupied_columns = sorted(self.occupied_columns)
+        empty_cols_before = [x - bisect_left(occupied_columns, x) for x in self.cols]
+        plain = sum_pairwise_distances(self.rows) + sum_pairwise_distances(self.cols)
+        empty = sum_pairwise_distances(self.empty_rows_before) + sum_pairwise_distances(empty_cols_before)
+        return [plain + (rate - 1) * empty for rate in inflate_rates]
+
+
+def sum_pairwise_distances(coords: Iterable[int]) -> int:
+    # sum of |a - b| over all pairs: after sorting, the k-th of n values is added k times and subtracted n - 1 - k times
+    coords = sorted(coords)
+    n = len(coords)
+    return sum(c * (2 * k - n + 1) for k, c in enumerate(coords))
+
+
+def test_calc_total_distances():
+    galaxy_observer = GalaxyObserver(data_path("input_d11_small.txt"))
+    assert galaxy_observer.calc_total_distances([2, 10, 100]) == [374, 1030, 8410]
+    assert galaxy_observer.calc_total_distances([1000000]) == [galaxy_observer.calc_total_distance()]
+    assert sum_pairwise_distances([3, 1, 2]) == 4
+
+
+def test_sparse_galaxies():
+    galaxies = SparseGalaxies.from_file(data_path("input_d11_small.txt"))
+    assert len(galaxies.rows) == 9
+    assert galaxies.calc_total_distances([2, 10, 100]) == [374, 1030, 8410]
+    # two galaxies in the corners of a 10000 x 10000 map, only one row and one column aren't empty
+    side = 10000
+    lines = ("#" + "." * (side - 1) if y == 0 else "." * (side - 1) + "#" if y == side - 1 else "." * side
+             for y in range(side))
+    galaxies = SparseGalaxies.from_lines(lines)
+    assert galaxies.calc_total_distances([1, 3]) == [2 * (side - 1), 2 * (side - 1) + 2 * 2 * (side - 2)]
+
+
+def test_all():
+    test_calc_total_distances()
+    test_sparse_galaxies()
+
+
 if __name__ == "__main__":
     galaxy_observer = GalaxyObserver("/Users/andreisitaev/Downloads/input_d11.txt")
     # print(galaxy_observer)
     total_dist = galaxy_observer.calc_total_distance()
+    print(galaxy_observer.calc_total_distances([2, 1000000]))
@@ -1,9 +1,48 @@
-from typing import List, Tuple, Dict
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from typing import List, Tuple, Dict, Sequence, Optional, TypeAlias
+
+Row: TypeAlias = Tuple[str, Tuple[int, ...]]  # unfolded pattern, groups
+
+
+def count_arrangements(pattern: str, groups: Sequence[int]) -> int:
+    """
+    ways[g][i] - the number of ways to place the groups g, g + 1, ... into pattern[i:].
+    Either the cell i is empty (not "#"), or the group g starts at i: no "." under it
+    (prefix counts of "."), and not a "#" right after it. O(len(pattern) * len(groups))
+    """
+    n = len(pattern)
+    dots = list(accumulate((c == "." for c in pattern), initial=0))
+    hashes = list(accumulate((c == "#" for c in pattern), initial=0))
+    # all the groups are placed: the rest must have no "#"
+    ways = [1 if hashes[n] == hashes[i] else 0 for i in range(n + 1)]
+    for group in reversed(groups):
+        next_ways = ways
+        ways = [0] * (n + 1)
+        for i in range(n - group, -1, -1):
+            count = ways[i + 1] if pattern[i] != "#" else 0
+            end = i + group
+            if dots[end] == dots[i] and (end == n or pattern[end] != "#"):
+                count += next_ways[min(end + 1, n)]
+            ways[i] = count
+    return ways[0]
+
+
+def _solve_rows(rows: List[Row]) -> List[Tuple[int, float]]:
+    # (arrangements, seconds) per row
+    results = []
+    for pattern, groups in rows:
+        started = time.perf_counter()
+        count = count_arrangements(pattern, groups)
+        results.append((count, time.perf_counter() - started))
+    return results
 
 
 class SudokuLine:
-    def __init__(self, line: str) -> None:
+    def __init__(self, line: str, unfold: int = 5) -> None:
         self.orig_line = line
+        self.unfold = unfold
         self.groups: Tuple[int,] = ()
         self.line: str = ""
         self.total_solutions: int = 0
@@ -19,13 +58,17 @@ class SudokuLine:
     def _parse(self):
         # line looks like ".??..??...?##. 1,1,3"
         line, groups_str = self.orig_line.split(" ")
-        # bloat 5 times
-        line = "?".join([line] * 5)
-        groups_str = ",".join([groups_str] * 5)
+        # bloat "unfold" times
+        line = "?".join([line] * self.unfold)
+        groups_str = ",".join([groups_str] * self.unfold)
         self.line = line
         self.groups = tuple([int(c) for c in groups_str.split(",")])
 
     def solve(self) -> int:
+        return count_arrangements(self.line, self.groups)
+
+    def solve_by_recursion(self) -> int:
+        # the original version, memoised on the remaining line and groups as a string
         self._solve_group(str(self.line), 0, 0)
         return self.total_solutions
 
@@ -84,19 +127,84 @@ class SudokuLine:
 
 
 class Sudoku:
-    def __init__(self, file_path: str) -> None:
+    def __init__(self, file_path: str, unfold: int = 5) -> None:
         self.file_path = file_path
+        self.unfold = unfold
         self.board: List[SudokuLine] = []
+        # original line -> seconds, filled by solve_parallel()
+        self.row_timings: Dict[str, float] = {}
         self._read_file()
 
     def solve(self) -> int:
         return sum([line.solve() for line in self.board])
 
+    def solve_parallel(self, workers: Optional[int] = None, chunk_size: int = 64) -> int:
+        """
+        identical rows are solved once, the unique ones are sent to a process pool in chunks
+        (workers=1 solves them in this process). Per-row times end up in row_timings
+        """
+        unique_rows: List[Row] = list(dict.fromkeys((line.line, line.groups) for line in self.board))
+        chunks = [unique_rows[i:i + chunk_size] for i in range(0, len(unique_rows), chunk_size)]
+        if workers == 1:
+            results = [r for chunk in chunks for r in _solve_rows(chunk)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = [r for chunk_results in executor.map(_solve_rows, chunks) for r in chunk_results]
+
+        solved: Dict[Row, Tuple[int, float]] = dict(zip(unique_rows, results))
+        total = 0
+        for line in self.board:
+            count, seconds = solved[(line.line, line.groups)]
+            line.total_solutions = count
+            self.row_timings[line.orig_line] = seconds
+            total += count
+        return total
+
+    def slowest_rows(self, count: int = 10) -> List[Tuple[float, str]]:
+        # the pathological records of the last solve_parallel()
+        return sorted(((t, line) for line, t in self.row_timings.items()), reverse=True)[:count]
+
     def _read_file(self) -> None:
         with open(self.file_path, 'r') as file:
             lines = file.readlines()
         lines = [l.strip() for l in lines]
-        self.board = [SudokuLine(l) for l in lines if l]
+        self.board = [SudokuLine(l, self.unfold) for l in lines if l]
+
+
+def solve_file(file_path: str) -> int:
+    return Sudoku(file_path).solve()
+
+
+def test_count_arrangements():
+    rows = ["???.### 1,1,3", ".??..??...?##. 1,1,3", "?#?#?#?#?#?#?#? 1,3,1,6",
+            "????.#...#... 4,1,1", "????.######..#####. 1,6,5", "?###???????? 3,2,1"]
+    assert [SudokuLine(r, 1).solve() for r in rows] == [1, 4, 1, 1, 4, 10]
+    assert [SudokuLine(r).solve() for r in rows] == [1, 16384, 1, 16, 2500, 506250]
+    assert [SudokuLine(r, 3).solve() for r in rows] == [SudokuLine(r, 3).solve_by_recursion() for r in rows]
+    assert count_arrangements("", []) == 1
+    assert count_arrangements("#", []) == 0
+    assert count_arrangements("?", [2]) == 0
+
+
+def test_solve_parallel():
+    import os
+    import tempfile
+
+    rows = ["???.### 1,1,3", ".??..??...?##. 1,1,3", "?#?#?#?#?#?#?#? 1,3,1,6",
+            "????.#...#... 4,1,1", "????.######..#####. 1,6,5", "?###???????? 3,2,1", "???.### 1,1,3"]
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = os.path.join(folder, "springs.txt")
+        with open(file_path, "w") as f:
+            f.write("\n".join(rows) + "\n")
+        sudoku = Sudoku(file_path)
+        assert sudoku.solve_parallel(workers=1) == sudoku.solve_parallel(workers=2, chunk_size=2) == 525153
+        assert len(sudoku.row_timings) == 6
+        assert len(sudoku.slowest_rows(3)) == 3
+
+
+def test_all():
+    test_count_arrangements()
+    test_solve_parallel()
 
 
 if __name__ == "__main__":
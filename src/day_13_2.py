@@ -1,4 +1,9 @@
-from typing import List, Optional, Set, Tuple
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Set, Tuple
+
+from src.file_path import data_path
 
 
 class MirrorDetector:
@@ -77,6 +82,122 @@ class MirrorDetector:
         return index
 
 
+@dataclass(frozen=True)
+class Reflection:
+    # a horizontal mirror between the rows axis - 1 and axis, or a vertical one between the columns
+    is_row: bool
+    axis: int
+    smudges: int
+
+    @property
+    def score(self) -> int:
+        return 100 * self.axis if self.is_row else self.axis
+
+
+class BitPattern:
+    """
+    every row and every column encoded once as an int ("#" is a 1 bit). Two lines mirror
+    each other if the ints are equal, and the number of smudges between them is the popcount of a ^ b
+    """
+
+    def __init__(self, lines: List[str]):
+        self.rows = [int(line.replace("#", "1").replace(".", "0"), 2) for line in lines]
+        self.columns = [int("".join(column).replace("#", "1").replace(".", "0"), 2) for column in zip(*lines)]
+
+    def reflections(self, max_smudges: Optional[int] = None) -> List[Reflection]:
+        # all the axes, vertical first, with their smudge counts; axes with more than max_smudges are skipped
+        return ([Reflection(False, axis, smudges) for axis, smudges in self._find_axes(self.columns, max_smudges)] +
+                [Reflection(True, axis, smudges) for axis, smudges in self._find_axes(self.rows, max_smudges)])
+
+    def score(self, smudges: int = 1) -> int:
+        # the sum of the axes with exactly that many smudges
+        return sum(r.score for r in self.reflections(smudges) if r.smudges == smudges)
+
+    @classmethod
+    def _find_axes(cls, lines: List[int], max_smudges: Optional[int]) -> List[Tuple[int, int]]:
+        axes = []
+        for axis in range(1, len(lines)):
+            smudges = 0
+            for k in range(min(axis, len(lines) - axis)):
+                smudges += (lines[axis - 1 - k] ^ lines[axis + k]).bit_count()
+                if max_smudges is not None and smudges > max_smudges:
+                    break
+            else:
+                axes.append((axis, smudges))
+        return axes
+
+
+def iter_patterns(file_path: str) -> Iterator[List[str]]:
+    # blank line separated patterns, one at a time
+    pattern = []
+    with open(file_path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                pattern.append(line)
+            elif pattern:
+                yield pattern
+                pattern = []
+    if pattern:
+        yield pattern
+
+
+def score_patterns(patterns: List[List[str]], smudges: int) -> int:
+    return sum(BitPattern(lines).score(smudges) for lines in patterns)
+
+
+def scan_file(file_path: str, smudges: int = 1, workers: Optional[int] = None, chunk_size: int = 1024) -> int:
+    """
+    the total score of all the patterns of the file, each with exactly "smudges" smudges.
+    Patterns are read lazily and scored in chunks by a process pool (workers=1 scores them here),
+    at most two chunks per worker are in flight, so memory doesn't grow with the file size
+    """
+    chunks = _iter_chunks(iter_patterns(file_path), chunk_size)
+    if workers == 1:
+        return sum(score_patterns(chunk, smudges) for chunk in chunks)
+
+    total = 0
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Set[Future] = set()
+        for chunk in chunks:
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                total += sum(f.result() for f in done)
+            pending.add(executor.submit(score_patterns, chunk, smudges))
+        total += sum(f.result() for f in pending)
+    return total
+
+
+def _iter_chunks(patterns: Iterator[List[str]], chunk_size: int) -> Iterator[List[List[str]]]:
+    chunk = []
+    for pattern in patterns:
+        chunk.append(pattern)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def test_bit_pattern():
+    with open(data_path("input_d13_small.txt")) as f:
+        patterns = [BitPattern(p.split()) for p in f.read().split("\n\n") if p.strip()]
+    assert [p.score(0) for p in patterns] == [5, 400]
+    assert [p.score(1) for p in patterns] == [300, 100]
+    assert Reflection(True, 3, 1) in patterns[0].reflections()
+    assert all(r.smudges <= 1 for r in patterns[1].reflections(1))
+
+
+def test_scan_file():
+    file_path = data_path("input_d13_small.txt")
+    assert len(list(iter_patterns(file_path))) == 2
+    assert scan_file(file_path, 0, workers=1) == 405
+    assert scan_file(file_path, 1, workers=2, chunk_size=1) == 400
+    # two smudges: vertical mirrors after the columns 1 and 7
+    assert scan_file(file_path, 2, workers=1) == 8
+
+
 def test_sample():
     lines = """
 ##########.
@@ -93,9 +214,15 @@ def test_sample():
     print(detector.detect())
 
 
-def test_full():
-    # 34443 <- too high, should be 33438
-    with open("/Users/andreisitaev/Downloads/input_d13.txt", "r") as file:
+def solve_file(file_path: str) -> int:
+    total = scan_file(file_path, workers=1)
+    print(f"Total: {total}")
+    return total
+
+
+def solve_file_by_detector(file_path: str) -> int:
+    # the original version, MirrorDetector fixes the smudges in place
+    with open(file_path, "r") as file:
         lines = file.readlines()
     lines = [l.strip() for l in lines]
     matrix_lines = []
@@ -112,7 +239,18 @@ def test_full():
     if matrix_lines:
         detector = MirrorDetector(matrix_lines)
         total += detector.detect()
-        print(f"Total: {total}")
+    print(f"Total: {total}")
+    return total
+
+
+def test_full():
+    # 34443 <- too high, should be 33438
+    solve_file("/Users/andreisitaev/Downloads/input_d13.txt")
+
+
+def test_all():
+    test_bit_pattern()
+    test_scan_file()
 
 
 if __name__ == "__main__":
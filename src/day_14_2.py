@@ -1,5 +1,10 @@
 import math
-from typing import List
+from abc import ABC, abstractmethod
+from typing import Hashable, Iterable, List, Tuple
+
+import numpy as np
+
+from src.file_path import data_path, read_grid
 
 
 class ControlPanel:
@@ -108,6 +113,231 @@ class ControlPanel:
         self.w = len(self.matrix[0])
 
 
+class SpinningPanel(ABC):
+    # spin(), load() and state() are up to the backend
+
+    @abstractmethod
+    def spin(self, cycles: int = 1) -> None:
+        pass
+
+    @abstractmethod
+    def load(self) -> int:
+        pass
+
+    @abstractmethod
+    def state(self) -> Hashable:
+        pass
+
+    def load_after(self, cycles: int) -> int:
+        # spins until the dish repeats a state, then jumps to the cycle's state for "cycles"
+        loads = []
+
+        def spin_states() -> Iterable[Hashable]:
+            while True:
+                loads.append(self.load())
+                yield self.state()
+                self.spin()
+
+        mu, period = find_cycle(spin_states())
+        return loads[index_in_cycle(cycles, mu, period)]
+
+
+class NumpyPanel(SpinningPanel):
+    """
+    the dish as bool masks of boulders and rocks. Boulders roll north segment by segment:
+    a segment is a run of non-rock cells of a column below a rock (or the edge), its boulders
+    fill its first cells. The other directions are north after rotating the dish clockwise
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        grid = read_grid(file_path)
+        self.h, self.w = grid.shape
+        self.boulders = grid == ord("O")
+        rocks = grid == ord("#")
+        # segment ids and the cell's offset in its segment, for the 4 orientations of a spin cycle
+        self._segments: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        for _ in range(4):
+            self._segments.append(self._find_segments(rocks))
+            rocks = np.rot90(rocks, -1)
+
+    def __str__(self):
+        grid = np.full(self.boulders.shape, ".")
+        grid[self._segments[0][0]] = "#"
+        grid[self.boulders] = "O"
+        return "\n".join(["".join(l) for l in grid])
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def _find_segments(cls, rocks: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        h, w = rocks.shape
+        rows = np.arange(h)[:, None]
+        # a new segment starts below every rock, segments of different columns get different ids
+        segment = np.cumsum(rocks, axis=0) + np.arange(w)[None, :] * (h + 1)
+        last_rock = np.maximum.accumulate(np.where(rocks, rows, -1), axis=0)
+        offset = rows - last_rock - 1
+        return rocks, segment, offset
+
+    def tilt_north(self, orientation: int = 0) -> None:
+        rocks, segment, offset = self._segments[orientation]
+        counts = np.bincount(segment[self.boulders], minlength=segment.shape[1] * (segment.shape[0] + 1))
+        self.boulders = ~rocks & (offset < counts[segment])
+
+    def spin(self, cycles: int = 1) -> None:
+        # north, west, south, east: tilt north, rotate clockwise, 4 times
+        for _ in range(cycles):
+            for orientation in range(4):
+                self.tilt_north(orientation)
+                self.boulders = np.rot90(self.boulders, -1)
+
+    def load(self) -> int:
+        return int((self.boulders.sum(axis=1) * np.arange(self.h, 0, -1)).sum())
+
+    def state(self) -> bytes:
+        # the boulders are all that changes, 1 bit per cell
+        return np.packbits(self.boulders).tobytes()
+
+
+class BitPanel(SpinningPanel):
+    """
+    the whole dish as one Python int, row by row: the cell (r, c) is the bit r * (w + 1) + c,
+    the extra bit of every row is a wall, so nothing rolls from one row to the next. A tilt moves
+    all the boulders with a free cell next to them one cell at once (a shift by 1 for west / east,
+    by a row for north / south) until none can move, every step is a few whole-board int ops
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        grid = read_grid(file_path)
+        self.h, self.w = grid.shape
+        self.stride = self.w + 1
+        self.rocks = grid == ord("#")
+        # the wall column is neither free nor a boulder
+        self.open = self._to_int(~self.rocks)
+        self.boulders = self._to_int(grid == ord("O"))
+
+    def __str__(self):
+        grid = np.full((self.h, self.w), ".")
+        grid[self.rocks] = "#"
+        grid[self._to_mask(self.boulders)] = "O"
+        return "\n".join(["".join(l) for l in grid])
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _to_int(self, mask: np.ndarray) -> int:
+        padded = np.zeros((self.h, self.stride), dtype=bool)
+        padded[:, :self.w] = mask
+        return int.from_bytes(np.packbits(padded, bitorder="little").tobytes(), "little")
+
+    def _to_mask(self, bits: int) -> np.ndarray:
+        size = self.h * self.stride
+        packed = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(packed, bitorder="little")[:size].reshape(self.h, self.stride)[:, :self.w].astype(bool)
+
+    def _tilt(self, shift: int, to_low: bool) -> None:
+        boulders = self.boulders
+        while True:
+            free = self.open ^ boulders
+            moving = boulders & (free << shift if to_low else free >> shift)
+            if not moving:
+                break
+            boulders ^= moving ^ (moving >> shift if to_low else moving << shift)
+        self.boulders = boulders
+
+    def tilt_north(self) -> None:
+        self._tilt(self.stride, True)
+
+    def spin(self, cycles: int = 1) -> None:
+        for _ in range(cycles):
+            self._tilt(self.stride, True)
+            self._tilt(1, True)
+            self._tilt(self.stride, False)
+            self._tilt(1, False)
+
+    def load(self) -> int:
+        return int((self._to_mask(self.boulders).sum(axis=1) * np.arange(self.h, 0, -1)).sum())
+
+    def state(self) -> int:
+        return self.boulders
+
+
+def find_cycle(states: Iterable[Hashable]) -> Tuple[int, int]:
+    """
+    (mu, period) of a sequence of states that becomes periodic: the state mu is the first one
+    to be repeated, and it's repeated "period" states later. Exact, as the whole states are compared
+    """
+    seen = {}
+    for index, state in enumerate(states):
+        if state in seen:
+            return seen[state], index - seen[state]
+        seen[state] = index
+    raise ValueError(f"no state repeats in {len(seen)} states")
+
+
+def index_in_cycle(index: int, mu: int, period: int) -> int:
+    # an index equivalent to "index", below mu + period
+    return index if index < mu else mu + (index - mu) % period
+
+
+def test_numpy_panel():
+    file_path = data_path("input_d14_small.txt")
+    panel = NumpyPanel(file_path)
+    panel.tilt_north()
+    assert panel.load() == 136
+    for cycles in [1, 2, 3]:
+        panel, reference = NumpyPanel(file_path), ControlPanel(file_path)
+        panel.spin(cycles)
+        for _ in range(4 * cycles):
+            reference.move()
+        assert str(panel) == str(reference)
+        assert panel.load() == reference._calc_weight()
+    assert NumpyPanel(file_path).load_after(1000000000) == 64
+
+
+def test_bit_panel():
+    file_path = data_path("input_d14_small.txt")
+    panel, reference = BitPanel(file_path), NumpyPanel(file_path)
+    panel.tilt_north()
+    reference.tilt_north()
+    assert str(panel) == str(reference) and panel.load() == 136
+    panel.spin(2)
+    reference = NumpyPanel(file_path)
+    reference.spin(2)
+    assert str(panel) == str(reference)
+    assert BitPanel(file_path).load_after(1000000000) == 64
+    assert BitPanel("input_d14_small.txt").load() == NumpyPanel("input_d14_small.txt").load()
+
+    # a non-square random dish, rows must not leak into each other
+    import tempfile
+
+    rnd = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = f"{folder}/dish.txt"
+        with open(file_path, "w") as f:
+            f.write("\n".join("".join(rnd.choice(list(".O#"), 37, p=[0.6, 0.3, 0.1])) for _ in range(23)) + "\n")
+        panel, reference = BitPanel(file_path), NumpyPanel(file_path)
+        panel.spin(3)
+        reference.spin(3)
+        assert str(panel) == str(reference) and panel.load() == reference.load()
+
+
+def test_find_cycle():
+    # 2 states before a cycle of 3
+    states = ["a", "b", "c", "d", "e", "c", "d", "e"]
+    assert find_cycle(states) == (2, 3)
+    assert [states[index_in_cycle(i, 2, 3)] for i in range(8)] == states
+    assert index_in_cycle(1000000000, 2, 3) == 4
+
+
+def test_all():
+    test_numpy_panel()
+    test_bit_panel()
+    test_find_cycle()
+
+
 def find_cycle_period(sequence):
     # NB: it takes some time for the sequence to stabilize
     # before getting periodic
@@ -139,6 +369,12 @@ def find_next_value(sequence: List[int], index: int) -> int:
 
 
 def sample_test():
+    panel = NumpyPanel("/Users/andreisitaev/Downloads/input_d14.txt")  # 88680
+    print(f"Predicted value: {panel.load_after(1000000000)}")
+
+
+def sample_test_by_loads():
+    # the original version: guesses the period from 330 loads
     panel = ControlPanel("/Users/andreisitaev/Downloads/input_d14.txt")  # 88680
 
     solutions = []
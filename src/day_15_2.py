@@ -1,4 +1,11 @@
-from typing import List
+from typing import Dict, List
+
+import numpy as np
+
+from src.file_path import data_path
+
+# HASH_TRANSITIONS[h, c] - the hash after the char c was added to the hash h
+HASH_TRANSITIONS = np.array([[(h + c) * 17 % 256 for c in range(256)] for h in range(256)], dtype=np.uint8)
 
 
 def get_hash(s: str) -> int:
@@ -86,6 +93,106 @@ class LensMassive:
                 box.append(Lense(label, focal))
 
 
+def read_steps(file_path: str) -> List[bytes]:
+    # the whole file split once, no per-char work; empty steps (e.g. after a trailing comma) are skipped
+    with open(file_path, "rb") as f:
+        data = f.read()
+    return [step for step in data.replace(b"\n", b"").replace(b"\r", b"").strip().split(b",") if step]
+
+
+def bulk_hash(items: List[bytes], chunk_size: int = 1 << 20) -> np.ndarray:
+    """
+    the hashes of all the items at once: within a chunk the items of the same length are laid out
+    as the rows of an (items x length) byte matrix, no padding, and their hashes advance one column
+    at a time through HASH_TRANSITIONS. Extra memory is about a chunk's bytes, whatever the input size
+    """
+    hashes = np.zeros(len(items), dtype=np.uint8)
+    for chunk_start in range(0, len(items), chunk_size):
+        chunk = items[chunk_start:chunk_start + chunk_size]
+        lengths = np.fromiter(map(len, chunk), dtype=np.int32, count=len(chunk))
+        for length in np.unique(lengths).tolist():
+            indices = np.flatnonzero(lengths == length)
+            chars = np.frombuffer(b"".join([chunk[i] for i in indices.tolist()]), dtype=np.uint8)
+            chars = chars.reshape(len(indices), length)
+            group_hashes = np.zeros(len(indices), dtype=np.uint8)
+            for column in range(length):
+                group_hashes = HASH_TRANSITIONS[group_hashes, chars[:, column]]
+            hashes[chunk_start + indices] = group_hashes
+    return hashes
+
+
+class LensBoxes:
+    """
+    every box is a dict label -> focal length: dicts keep the insertion order,
+    replacing a lens keeps its place and removing one is O(1)
+    """
+
+    def __init__(self):
+        self.boxes: List[Dict[bytes, int]] = [{} for _ in range(256)]
+
+    @classmethod
+    def from_file(cls, file_path: str) -> "LensBoxes":
+        boxes = cls()
+        boxes.run(read_steps(file_path))
+        return boxes
+
+    def run(self, steps: List[bytes]) -> None:
+        # "cm-" removes the lens cm, "rb=9" puts the lens rb with the focal length 9
+        labels = [step[:-1] if step.endswith(b"-") else step.partition(b"=")[0] for step in steps]
+        for step, label, index in zip(steps, labels, bulk_hash(labels).tolist()):
+            if step.endswith(b"-"):
+                self.boxes[index].pop(label, None)
+            else:
+                self.boxes[index][label] = int(step[len(label) + 1:])
+
+    def get_total_focus(self) -> int:
+        return sum((i + 1) * (j + 1) * focal_length
+                   for i, box in enumerate(self.boxes) for j, focal_length in enumerate(box.values()))
+
+
+def test_lens_boxes():
+    steps = "rn=1,cm-,qp=3,cm=2,qp-,pc=4,ot=9,ab=5,pc-,pc=6,ot=7".encode().split(b",")
+    assert bulk_hash([b"HASH", b"rn", b""]).tolist() == [52, 0, 0]
+    assert int(bulk_hash(steps).sum(dtype=np.int64)) == 1320
+    assert bulk_hash(steps).tolist() == [get_hash(s.decode()) for s in steps]
+    boxes = LensBoxes()
+    boxes.run(steps)
+    assert [list(b.items()) for b in boxes.boxes[:4]] == [
+        [(b"rn", 1), (b"cm", 2)], [], [], [(b"ot", 7), (b"ab", 5), (b"pc", 6)]]
+    assert boxes.get_total_focus() == 145
+    # a step with no focal length is an error, not a removal
+    try:
+        LensBoxes().run([b"rn=1", b"rn="])
+        assert False, "rn= should fail"
+    except ValueError:
+        pass
+    assert LensBoxes.from_file(data_path("input_d15_small.txt")).get_total_focus() == 145
+    # chunks and length groups don't change the order of the hashes
+    assert bulk_hash(steps, chunk_size=3).tolist() == bulk_hash(steps).tolist()
+
+
+def test_read_steps():
+    import os
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = os.path.join(folder, "steps.txt")
+        with open(file_path, "wb") as f:
+            f.write(b"rn=1,cm-,\r\nqp=3,\n\n")
+        assert read_steps(file_path) == [b"rn=1", b"cm-", b"qp=3"]
+        # rn=1 in the box 0, qp=3 in the box 1
+        assert LensBoxes.from_file(file_path).get_total_focus() == 1 * 1 + 2 * 3
+
+
+def test_all():
+    test_lens_boxes()
+    test_read_steps()
+
+
+def solve_file(file_path: str) -> int:
+    return LensBoxes.from_file(file_path).get_total_focus()
+
+
 def main():
     path = "/Users/andreisitaev/Downloads/input_d15.txt"  # 145
     lm = LensMassive(path)
@@ -178,6 +178,10 @@ class Pipeline:
             self._solve_node(self.workflows[condition.target], filtered)
 
 
+def solve_file(file_path: str) -> int:
+    return int(Pipeline(file_path).solve())
+
+
 def main():
     # 167409079868000 (right)
     # 167245503449662
@@ -1,7 +1,6 @@
 from typing import TypeAlias, Dict, List, Optional, Tuple, Set
 
-from src.day_14_2 import find_cycle_period
-from src.file_path import read_lines
+from src.file_path import read_lines, cached_parse
 
 Signal: TypeAlias = int
 LOW, ZERO, HIGH = -1, 0, 1
@@ -83,6 +82,10 @@ class AndNot(Module):
         return new_state
 
 
+def parse_modules(file_name: str) -> List[Module]:
+    return [Module.parse_module(line) for line in read_lines(file_name)]
+
+
 class Circuit:
     LAST_CASCADE = ["qz", "cq", "jx", "tt"]
 
@@ -95,10 +98,8 @@ class Circuit:
         self.ticks = 0
 
     def load_from_file(self, file_name: str):
-        lines = read_lines(file_name)
         index = 0
-        for line in lines:
-            module = Module.parse_module(line)
+        for module in cached_parse(file_name, parse_modules):
             self.modules[module.name] = module
             self.module_index[module.name] = index
             index += 1
@@ -2,7 +2,6 @@ import copy
 import numpy as np
 from typing import List, TypeAlias
 
-from src.day_14_2 import find_cycle_period
 from src.file_path import read_lines
 
 Point: TypeAlias = tuple[int, int]
@@ -1,6 +1,6 @@
 from typing import TypeAlias, List, Tuple, Dict, Set
 
-from src.file_path import read_lines
+from src.file_path import read_lines, cached_parse
 
 Point2: TypeAlias = tuple[int, int]
 Point3: TypeAlias = tuple[int, int, int]
@@ -26,11 +26,7 @@ class Brick:
 
     @classmethod
     def load_from_file(cls, file_path: str) -> List["Brick"]:
-        lines = read_lines(file_path)
-        bricks = [cls.from_str(line) for line in lines]
-        for i, brick in enumerate(bricks):
-            brick.index = i
-        return bricks
+        return cached_parse(file_path, parse_bricks)
 
     @classmethod
     def from_str(cls, brick_str: str) -> "Brick":
@@ -55,6 +51,13 @@ class Brick:
         self.top -= delta
 
 
+def parse_bricks(file_path: str) -> List[Brick]:
+    bricks = [Brick.from_str(line) for line in read_lines(file_path)]
+    for i, brick in enumerate(bricks):
+        brick.index = i
+    return bricks
+
+
 class BrickLayer:
     def __init__(self, order: str):
         self.order = order
@@ -1,7 +1,7 @@
 import copy
 from typing import List, TypeAlias, Set, Tuple, Dict
 
-from src.file_path import read_lines
+from src.file_path import read_lines, cached_parse
 
 Point: TypeAlias = tuple[int, int]
 
@@ -115,6 +115,11 @@ class Graph:
         return node
 
 
+def parse_surface(file_path: str) -> List[List[str]]:
+    # slopes are treated as plain paths
+    return [["." if smb in SLOPES else smb for smb in line] for line in read_lines(file_path)]
+
+
 class Island:
     def __init__(self, file_path: str):
         self.surface: List[List[str]] = []
@@ -196,18 +201,9 @@ class Island:
         return options
 
     def _read_file(self, file_path: str):
-        lines = read_lines(file_path)
-        self.surface = [list(l) for l in lines]
+        self.surface = cached_parse(file_path, parse_surface)
         self.w = len(self.surface[0])
         self.h = len(self.surface)
-
-        for y in range(self.h):
-            for x in range(self.w):
-                smb = self.surface[y][x]
-                if smb in SLOPES:
-                    smb = "."
-                self.surface[y][x] = smb
-
         self.start = (1, 0)
         self.end = (self.w - 2, self.h - 1)
 
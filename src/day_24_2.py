@@ -8,7 +8,7 @@ as I failed with the gradient descent approach.
 import math
 from typing import TypeAlias, List, Optional
 
-from src.file_path import read_lines
+from src.file_path import read_lines, cached_parse
 
 Point3: TypeAlias = tuple[int, int, int]
 
@@ -34,6 +34,10 @@ class Stone:
         return Stone(self.p, self.v)
 
 
+def parse_stones(file_path: str) -> List[Stone]:
+    return [Stone.parse_line(line) for line in read_lines(file_path)]
+
+
 class Hail:
     def __init__(self, file_path: str):
         self.stones: List[Stone] = []
@@ -108,9 +112,7 @@ class Hail:
         return round(x), round(y), round(z)
 
     def load_from_file(self, file_path: str):
-        lines = read_lines(file_path)
-        for line in lines:
-            self.stones.append(Stone.parse_line(line))
+        self.stones.extend(cached_parse(file_path, parse_stones))
 
 
 def solve_task():
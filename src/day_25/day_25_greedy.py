@@ -13,7 +13,7 @@ Works fine.
 import random
 from typing import List, Tuple, Iterable, Dict, Set
 
-from file_path import read_lines
+from src.file_path import read_lines
 
 
 class Graph:
@@ -5,7 +5,7 @@ This implementation just doesn't find the min cut
 import random
 from typing import List, Tuple, Set
 
-from file_path import read_lines
+from src.file_path import read_lines
 
 class Graph:
     def __init__(self):
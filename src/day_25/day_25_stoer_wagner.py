@@ -6,7 +6,7 @@ import random
 import numpy as np
 from typing import List, Tuple, Iterable, Dict, Set
 
-from file_path import read_lines
+from src.file_path import read_lines
 
 
 class Graph:
@@ -17,8 +17,7 @@ def read_file_lines(file_path: str) -> List[Tuple[List[int], Set[int]]]:
     return rows
 
 
-def solve():
-    rows = read_file_lines("/Users/andreisitaev/Downloads/input_d4_1.txt")
+def score_cards(rows: List[Tuple[List[int], Set[int]]]) -> int:
     total = 0
     for left, right in rows:
         card_weight = 0
@@ -26,7 +25,12 @@ def solve():
             if num in right:
                 card_weight = 1 if not card_weight else 2 * card_weight
         total += card_weight
-    print(total)
+    return total
+
+
+def solve():
+    rows = read_file_lines("/Users/andreisitaev/Downloads/input_d4_1.txt")
+    print(score_cards(rows))
 
 
 if __name__ == "__main__":
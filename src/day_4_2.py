@@ -1,23 +1,83 @@
 import re
 from typing import List, Tuple, Set
 
+import numpy as np
 
-def read_file_lines(file_path: str) -> List[Tuple[List[int], Set[int]]]:
+
+def read_card_numbers(file_path: str) -> List[Tuple[List[int], List[int]]]:
+    # (winning, held) numbers of every card as they are written, duplicates included
     with open(file_path, "r") as file:
         lines = file.readlines()
     rows = []
     reg = re.compile(r"^Card\s+\d+:\s+")
     for line in lines:
         line = line.strip()
+        if not line:
+            continue
         line = reg.sub("", line)
         left_right = line.split("|")
         left = [int(s) for s in left_right[0].strip().split(" ") if s]
-        right = set([int(s) for s in left_right[1].strip().split(" ") if s])
+        right = [int(s) for s in left_right[1].strip().split(" ") if s]
         rows.append((left, right))
     return rows
 
 
+def read_file_lines(file_path: str) -> List[Tuple[List[int], Set[int]]]:
+    return [(left, set(right)) for left, right in read_card_numbers(file_path)]
+
+
+def read_file_arrays(file_path: str) -> Tuple[np.ndarray, np.ndarray]:
+    # winning (cards x W) and held (cards x H) numbers, all the cards have the same W and H
+    rows = read_card_numbers(file_path)
+    winning = np.array([left for left, _right in rows], dtype=np.int64)
+    held = np.array([right for _left, right in rows], dtype=np.int64)
+    return winning, held
+
+
+def count_wins(winning: np.ndarray, held: np.ndarray) -> np.ndarray:
+    """
+    win count of every card at once: the held numbers are sorted row by row and shifted by
+    card index * span, so the flattened array is sorted and one searchsorted looks up
+    the winning numbers of all the cards - O(cards x numbers x log) time, O(cards x numbers) memory
+    """
+    if not winning.size or not held.size:
+        return np.zeros(winning.shape[0], dtype=np.int64)
+    low = min(int(winning.min()), int(held.min()))
+    span = max(int(winning.max()), int(held.max())) - low + 1
+    offsets = np.arange(winning.shape[0], dtype=np.int64)[:, None] * span
+    flat_held = (np.sort(held, axis=1) - low + offsets).ravel()
+    keys = winning - low + offsets
+    found = np.searchsorted(flat_held, keys)
+    found = np.minimum(found, flat_held.size - 1)
+    return (flat_held[found] == keys).sum(axis=1)
+
+
+def count_cards(wins: List[int]) -> int:
+    """
+    card i with w wins adds its copies to the cards i + 1 ... i + w. Instead of adding them
+    one by one, the copies are added to a difference array: +copies at i + 1, -copies at i + w + 1,
+    the running sum of which is the count of copies won by the current card
+    """
+    diff = [0] * (len(wins) + 1)
+    won, total = 0, 0
+    for i, num_wins in enumerate(wins):
+        won += diff[i]
+        copies = won + 1
+        total += copies
+        if num_wins:
+            diff[i + 1] += copies
+            diff[min(i + num_wins + 1, len(wins))] -= copies
+    return total
+
+
 def solve():
+    winning, held = read_file_arrays("/Users/andreisitaev/Downloads/input_d4_1.txt")
+    total = count_cards(count_wins(winning, held).tolist())
+    print(total)
+
+
+def solve_copying():
+    # the original version, O(total cards)
     rows = read_file_lines("/Users/andreisitaev/Downloads/input_d4_1.txt")
     total = len(rows)
     multipliers = {}
@@ -35,5 +95,35 @@ def solve():
     print(total)
 
 
+def test_count_cards():
+    winning = np.array([[41, 48, 83, 86, 17], [13, 32, 20, 16, 61], [1, 21, 53, 59, 44],
+                        [41, 92, 73, 84, 69], [87, 83, 26, 28, 32], [31, 18, 13, 56, 72]])
+    held = np.array([[83, 86, 6, 31, 17, 9, 48, 53], [61, 30, 68, 82, 17, 32, 24, 19],
+                     [69, 82, 63, 72, 16, 21, 14, 1], [59, 84, 76, 51, 58, 5, 54, 83],
+                     [88, 30, 70, 12, 93, 22, 82, 36], [74, 77, 10, 23, 35, 67, 36, 11]])
+    wins = count_wins(winning, held)
+    assert wins.tolist() == [4, 2, 2, 1, 0, 0]
+    assert count_cards(wins.tolist()) == 30
+
+
+def test_read_file_arrays():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as folder:
+        file_path = f"{folder}/cards.txt"
+        with open(file_path, "w") as f:
+            # a held number repeated on one card only
+            f.write("Card 1: 41 48 | 83 48 48 17\n"
+                    "Card 2: 13 32 | 61 30 68 32\n")
+        winning, held = read_file_arrays(file_path)
+        assert held.shape == (2, 4)
+        assert count_wins(winning, held).tolist() == [1, 1]
+
+
+def test_all():
+    test_count_cards()
+    test_read_file_arrays()
+
+
 if __name__ == "__main__":
-    solve()
\ No newline at end of file
+    solve()
@@ -1,8 +1,14 @@
-from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
+import heapq
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import List, Dict, Optional, Tuple, Iterator, Iterable, Sequence
 
 
 class SeedSeq:
+    __slots__ = ("start", "count", "mapped")
+
     start: int
     count: int
     mapped: bool
@@ -74,6 +80,84 @@ class AlmanacRange:
 
         return mapped_sequences
 
+class PiecewiseMap:
+    """
+    a sorted-breakpoints index of a map: the values starts[i] ... starts[i + 1] - 1
+    are shifted by offsets[i], the last segment lasts forever. starts[0] is 0,
+    gaps between the ranges are segments with 0 offset
+    """
+
+    def __init__(self, starts: Sequence[int], offsets: Sequence[int]):
+        # flat int64 arrays rather than lists of boxed ints
+        self.starts = array("q", starts)
+        self.offsets = array("q", offsets)
+
+    def __str__(self) -> str:
+        return ", ".join([f"{s}: {o:+}" for s, o in zip(self.starts, self.offsets)])
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    @classmethod
+    def from_ranges(cls, ranges: List["AlmanacRange"]) -> "PiecewiseMap":
+        starts, offsets = [0], [0]
+        for rng in sorted(ranges, key=lambda r: r.src_start):
+            if rng.src_start == starts[-1]:
+                offsets[-1] = rng.dest_start - rng.src_start
+            else:
+                starts.append(rng.src_start)
+                offsets.append(rng.dest_start - rng.src_start)
+            # back to the identity after the range, unless the next range starts right here
+            starts.append(rng.src_start + rng.length)
+            offsets.append(0)
+        return cls(starts, offsets)._merged()
+
+    def map_value(self, src: int) -> int:
+        return src + self.offsets[bisect_right(self.starts, src) - 1]
+
+    def map_range(self, start: int, count: int) -> Iterator[Tuple[int, int]]:
+        # yields (dst start, count) of every segment the range [start, start + count) crosses
+        end = start + count
+        i = bisect_right(self.starts, start) - 1
+        while start < end:
+            seg_end = self.starts[i + 1] if i + 1 < len(self.starts) else end
+            piece_end = min(end, seg_end)
+            yield start + self.offsets[i], piece_end - start
+            start = piece_end
+            i += 1
+
+    def compose(self, other: "PiecewiseMap") -> "PiecewiseMap":
+        # a map doing "self", then "other"
+        starts, offsets = [], []
+        for i, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            end = self.starts[i + 1] if i + 1 < len(self.starts) else None
+            # split the segment's image by the other's breakpoints
+            j = bisect_right(other.starts, start + offset) - 1
+            seg_start = start
+            while True:
+                starts.append(seg_start)
+                offsets.append(offset + other.offsets[j])
+                j += 1
+                if j == len(other.starts):
+                    break
+                seg_start = other.starts[j] - offset
+                if end is not None and seg_start >= end:
+                    break
+        return PiecewiseMap(starts, offsets)._merged()
+
+    def _merged(self) -> "PiecewiseMap":
+        # drop empty segments and join the neighbours with the same offset
+        starts, offsets = [], []
+        for i, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            if i + 1 < len(self.starts) and self.starts[i + 1] == start:
+                continue
+            if offsets and offsets[-1] == offset:
+                continue
+            starts.append(start)
+            offsets.append(offset)
+        return PiecewiseMap(starts, offsets)
+
+
 @dataclass
 class AlmanacMap:
     src_name: str
@@ -99,16 +183,75 @@ class AlmanacMap:
 
         return ranges_ready + ranges_to_map
 
+    def to_piecewise(self) -> PiecewiseMap:
+        return PiecewiseMap.from_ranges(self.ranges)
+
 
 @dataclass
 class Almanac:
-    seeds: List[int]
+    seeds: Sequence[int]
     maps: Dict[str, AlmanacMap]
     maps_order = ["seed-to-soil", "soil-to-fertilizer", "fertilizer-to-water",
                   "water-to-light", "light-to-temperature", "temperature-to-humidity",
                   "humidity-to-location"]
+    _composed_map: Optional[PiecewiseMap] = field(default=None, init=False, repr=False)
+
+    def composed_map(self) -> PiecewiseMap:
+        # seed -> location, all the maps in one, built once
+        if self._composed_map is None:
+            composed = PiecewiseMap([0], [0])
+            for map_name in self.maps_order:
+                composed = composed.compose(self.maps[map_name].to_piecewise())
+            self._composed_map = composed
+        return self._composed_map
 
     def find_min_location(self) -> int:
+        return self.min_location()
+
+    def iter_seed_ranges(self) -> Iterator[Tuple[int, int]]:
+        # (start, count) pairs of the "seeds:" line
+        for i in range(len(self.seeds) >> 1):
+            yield self.seeds[i * 2], self.seeds[i * 2 + 1]
+
+    def iter_locations(self,
+                       seed_ranges: Optional[Iterable[Tuple[int, int]]] = None) -> Iterator[Tuple[int, int, int]]:
+        """
+        streams (seed start, location start, count) segments: the seeds seed start ... seed start + count - 1
+        go to the locations location start ... location start + count - 1. The seed ranges
+        are the almanac's own unless passed, any iterable of (start, count) pairs will do
+        """
+        composed = self.composed_map()
+        for start, count in self.iter_seed_ranges() if seed_ranges is None else seed_ranges:
+            seed = start
+            for location, location_count in composed.map_range(start, count):
+                yield seed, location, location_count
+                seed += location_count
+
+    def min_location(self, seed_ranges: Optional[Iterable[Tuple[int, int]]] = None) -> Optional[int]:
+        # the maps only shift values, so the least location of a segment is its first one
+        return min((location for _seed, location, _count in self.iter_locations(seed_ranges)), default=None)
+
+    def max_location(self, seed_ranges: Optional[Iterable[Tuple[int, int]]] = None) -> Optional[int]:
+        return max((location + count - 1 for _seed, location, count in self.iter_locations(seed_ranges)),
+                   default=None)
+
+    def count_seeds(self, seed_ranges: Optional[Iterable[Tuple[int, int]]] = None) -> int:
+        return sum(count for _seed, _location, count in self.iter_locations(seed_ranges))
+
+    def top_k_locations(self, k: int,
+                        seed_ranges: Optional[Iterable[Tuple[int, int]]] = None) -> List[Tuple[int, int]]:
+        """
+        k least (location, seed) pairs. Every segment holds at least one value not less than
+        its start, so the k least values are in the k segments with the least starts
+        """
+        def segment_values(seed: int, location: int, count: int) -> Iterator[Tuple[int, int]]:
+            for i in range(count):
+                yield location + i, seed + i
+
+        segments = heapq.nsmallest(k, self.iter_locations(seed_ranges), key=lambda s: s[1])
+        return list(islice(heapq.merge(*[segment_values(*s) for s in segments]), k))
+
+    def find_min_location_by_splitting(self) -> int:
         ordered_maps = [self.maps[map_name] for map_name in self.maps_order]
 
         seed_ranges = []
@@ -132,7 +275,11 @@ class Almanac:
 
 def parse_almanac(file_path: str) -> Almanac:
     with open(file_path, 'r') as file:
-        lines = file.readlines()
+        return parse_almanac_str(file.read())
+
+
+def parse_almanac_str(text: str) -> Almanac:
+    lines = text.split("\n")
 
     seeds = []
     maps = {}
@@ -141,7 +288,7 @@ def parse_almanac(file_path: str) -> Almanac:
     for line in lines:
         line = line.strip()
         if line.startswith('seeds:'):
-            seeds = list(map(int, line.split(':')[1].split()))
+            seeds = array("q", map(int, line.split(':')[1].split()))
         elif '-to-' in line:
             src_name, dest_name = line.split('-to-')
             dest_name = dest_name.replace(" map:", "")
@@ -154,6 +301,68 @@ def parse_almanac(file_path: str) -> Almanac:
     return Almanac(seeds, maps)
 
 
+def test_composed_map():
+    almanac = parse_almanac_str("""
+seeds: 79 14 55 13
+
+seed-to-soil map:
+50 98 2
+52 50 48
+
+soil-to-fertilizer map:
+0 15 37
+37 52 2
+39 0 15
+
+fertilizer-to-water map:
+49 53 8
+0 11 42
+42 0 7
+57 7 4
+
+water-to-light map:
+88 18 7
+18 25 70
+
+light-to-temperature map:
+45 77 23
+81 45 19
+68 64 13
+
+temperature-to-humidity map:
+0 69 1
+1 0 69
+
+humidity-to-location map:
+60 56 37
+56 93 4
+""")
+    assert almanac.find_min_location() == 46
+    assert almanac.find_min_location_by_splitting() == 46
+
+    composed = almanac.composed_map()
+    ordered_maps = [almanac.maps[map_name] for map_name in almanac.maps_order]
+    for seed in range(120):
+        location = seed
+        for m in ordered_maps:
+            location = m.to_piecewise().map_value(location)
+        assert composed.map_value(seed) == location
+    assert [composed.map_value(s) for s in [79, 14, 55, 13]] == [82, 43, 86, 35]
+
+    # the queries agree with mapping the seeds one by one
+    locations = sorted((composed.map_value(seed), seed) for start, count in almanac.iter_seed_ranges()
+                       for seed in range(start, start + count))
+    assert almanac.min_location() == locations[0][0]
+    assert almanac.max_location() == locations[-1][0]
+    assert almanac.count_seeds() == len(locations)
+    assert almanac.top_k_locations(5) == locations[:5]
+    assert almanac.min_location([(79, 1), (13, 1)]) == 35
+
+
+def test_all():
+    test_composed_map()
+
+
 def solve():
     rn = AlmanacRange(src_start=98, dest_start=50, length=2)
     rn_2 = AlmanacRange(src_start=50, dest_start=52, length=48)
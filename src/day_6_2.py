@@ -1,5 +1,10 @@
-from math import sqrt, floor, ceil
-from typing import List, Tuple, Optional
+from math import isqrt
+from typing import List, Tuple, Optional, Sequence
+
+import numpy as np
+
+# t^2 and 4 * d must fit int64 for the vectorised path, bigger races are solved one by one
+MAX_NUMPY_VALUE = 2 ** 63
 
 
 class Race:
@@ -16,14 +21,26 @@ class Race:
 
     def get_roots(self) -> Optional[Tuple[int, int]]:
         # a*(t - a) - d > 0
-        # a^2 - at + d > 0
-        d2 = self.time**2 - self.distance * 4
+        # a^2 - at + d < 0
+        # integer math only: floats lose precision on the big numbers of the part 2
+        t, d = self.time, self.distance
+        d2 = t * t - d * 4
         if d2 < 0:
             return None
-        d = sqrt(d2) / 2
-        r1 = floor(self.time / 2 - d) + 1
-        r2 = ceil(self.time / 2 + d) - 1
-        return max(r1, 1), max(r2, 1)
+        r1 = (t - isqrt(d2)) // 2
+        # isqrt rounds down, the first winning time is r1 or a step further.
+        # t // 2 gives the longest distance, if it doesn't win nothing does
+        while r1 * (t - r1) <= d:
+            if r1 > t // 2:
+                return None
+            r1 += 1
+        while r1 > 0 and (r1 - 1) * (t - r1 + 1) > d:
+            r1 -= 1
+        # the parabola is symmetric
+        r2 = t - r1
+        if r1 > r2:
+            return None
+        return r1, r2
 
     def get_max_distance(self) -> int:
         v = self.time << 1
@@ -49,6 +66,54 @@ class Race:
         return races
 
 
+def count_wins_batch(times: Sequence[int], distances: Sequence[int]) -> np.ndarray:
+    """
+    win counts of many races at once. The float square root is only a first guess,
+    the result is fixed with exact integer comparisons, the same way get_roots does
+    """
+    largest = max((max(int(a) * int(a), 4 * int(b)) for a, b in zip(times, distances)), default=0)
+    if largest >= MAX_NUMPY_VALUE:
+        return np.array([Race(int(a), int(b)).get_win_nums() for a, b in zip(times, distances)], dtype=object)
+    t = np.asarray(times, dtype=np.int64)
+    d = np.asarray(distances, dtype=np.int64)
+
+    d2 = t * t - 4 * d
+    s = np.floor(np.sqrt(np.maximum(d2, 0).astype(np.float64))).astype(np.int64)
+    s = np.where(s * s > d2, s - 1, s)
+    s = np.where((s + 1) * (s + 1) <= d2, s + 1, s)
+    r1 = (t - s) // 2
+    r1 = np.where(r1 * (t - r1) <= d, r1 + 1, r1)
+    r1 = np.where((r1 > 0) & ((r1 - 1) * (t - r1 + 1) > d), r1 - 1, r1)
+    wins = t - 2 * r1 + 1
+    return np.where((d2 >= 0) & (wins > 0), wins, 0)
+
+
+def test_win_nums():
+    assert [Race(t, d).get_win_nums() for t, d in [(7, 9), (15, 40), (30, 200)]] == [4, 8, 9]
+    assert Race(71530, 940200).get_win_nums() == 71503
+    # a perfect square discriminant: 10 is a tie, not a win
+    assert Race(7, 10).get_win_nums() == 2
+    assert Race(3, 10).get_win_nums() == 0
+    # the best hold time only ties the record / falls short, with a non-negative discriminant
+    assert Race(4, 4).get_win_nums() == 0
+    assert Race(5, 6).get_win_nums() == 0
+    assert count_wins_batch([4, 5, 6], [4, 6, 8]).tolist() == [0, 0, 1]
+
+    times = np.arange(1, 3000)
+    distances = (times * times) // 5
+    brute = [sum(1 for a in range(t + 1) if a * (t - a) > d) for t, d in zip(times.tolist(), distances.tolist())]
+    assert count_wins_batch(times, distances).tolist() == brute
+    big = [10 ** 20 + 7]
+    assert count_wins_batch(big, [10 ** 39]).tolist() == [Race(big[0], 10 ** 39).get_win_nums()]
+    # small times with huge distances: 4 * d doesn't fit int64
+    assert count_wins_batch([10], [2 ** 62]).tolist() == [0]
+    assert count_wins_batch([10, 7], [2 ** 63, 9]).tolist() == [0, 4]
+
+
+def test_all():
+    test_win_nums()
+
+
 def solve():
     file_path = '/Users/andreisitaev/Downloads/input_d6_1.txt'
     races = Race.parse_file(file_path)
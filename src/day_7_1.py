@@ -1,6 +1,13 @@
 from itertools import groupby
 from typing import List
 
+from src.day_7_3 import CLASSIC_RULES, load_hands
+
+
+def hand_key(cards_str: str) -> int:
+    # hand type * 13^5 + cards as base-13 digits, sorts the hands the way the game does
+    return CLASSIC_RULES.hand_key(cards_str)
+
 
 class Card:
     LABEL_ORDER = reversed("A K Q J T 9 8 7 6 5 4 3 2".split())
@@ -36,6 +43,9 @@ class Hand:
         return self.__str__()
 
     def calculate_rank(self):
+        return hand_key("".join(c.label for c in self.cards))
+
+    def calculate_rank_by_sequences(self):
         seqs = self.longest_sequences()
         rate = self._calculate_combination_rank(seqs)
 
@@ -85,6 +95,10 @@ class Game:
         self._sort_hands()
         self.bid = self._calc_total_bid()
 
+    @classmethod
+    def calc_total_bid_vectorised(cls, file_path) -> int:
+        # no Hand / Card objects: the hands are ranked and sorted as one NumPy array
+        return CLASSIC_RULES.total_winnings(load_hands(file_path))
 
     def _sort_hands(self):
         self.hands.sort()
@@ -97,6 +111,21 @@ class Game:
         return total
 
 
+def test_hand_keys():
+    hands = ["32T3K", "T55J5", "KK677", "KTJJT", "QQQJA", "JJJJJ", "2345J", "JJ23J", "AKQJT"]
+    # the keys sort the hands the same way the sequences do
+    by_sequences = sorted(hands, key=lambda h: Hand(h, 0).calculate_rank_by_sequences())
+    assert sorted(hands, key=hand_key) == by_sequences
+
+
+def test_all():
+    test_hand_keys()
+
+
+def solve_file(file_path: str) -> int:
+    return Game(file_path).bid
+
+
 if __name__ == "__main__":
     game = Game('/Users/andreisitaev/Downloads/input_d7_1.txt')
     for hand in game.hands:
@@ -0,0 +1,151 @@
+"""
+Camel cards with the rules as a parameter: the label order, the wildcard labels
+and the hand type table. A hand's key is its type followed by its cards as digits
+in base len(labels), so comparing the keys compares the hands. Hands are parsed once into a compact structured array,
+then any number of rule variants could rank it, one sort per variant.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+import numpy as np
+
+CARDS_PER_HAND = 5
+
+# (the largest card count, the second largest one) -> hand type:
+# high card, one pair, two pairs, three, full house, four, five of a kind
+TYPE_BY_SIGNATURE: Dict[Tuple[int, int], int] = {
+    (1, 1): 0, (2, 1): 1, (2, 2): 2, (3, 1): 3, (3, 2): 4, (4, 1): 5, (5, 0): 6,
+}
+
+# 5 cards and a bid per row
+HAND_DTYPE = np.dtype([("cards", np.uint8, (CARDS_PER_HAND,)), ("bid", np.int64)])
+
+
+@dataclass
+class CardRules:
+    # labels from the weakest to the strongest, a label's index is its digit
+    labels: str
+    # wildcards join the largest group of the other cards
+    wildcards: str = ""
+    type_table: Dict[Tuple[int, int], int] = field(default_factory=lambda: dict(TYPE_BY_SIGNATURE))
+    # byte -> digit and the type table as arrays, for the vectorised path
+    _digits: np.ndarray = field(init=False, repr=False)
+    _is_wildcard: np.ndarray = field(init=False, repr=False)
+    _types: np.ndarray = field(init=False, repr=False)
+    # a hand type outweighs any cards: len(labels) ^ 5
+    type_weight: int = field(init=False)
+
+    def __post_init__(self):
+        self.type_weight = len(self.labels) ** CARDS_PER_HAND
+        self._digits = np.zeros(256, dtype=np.int64)
+        for digit, label in enumerate(self.labels):
+            self._digits[ord(label)] = digit
+        self._is_wildcard = np.array([label in self.wildcards for label in self.labels])
+        self._types = np.zeros((CARDS_PER_HAND + 1, CARDS_PER_HAND + 1), dtype=np.int64)
+        for (largest, second), hand_type in self.type_table.items():
+            self._types[largest, second] = hand_type
+
+    def hand_key(self, cards_str: str) -> int:
+        # hand type * type_weight + cards as base len(labels) digits
+        counts = Counter(cards_str)
+        wildcards = sum(counts.pop(w, 0) for w in self.wildcards)
+        largest, second = (sorted(counts.values(), reverse=True) + [0, 0])[:2]
+        key = self.type_table[(largest + wildcards, second)]
+        for label in cards_str:
+            key = key * len(self.labels) + self.labels.index(label)
+        return key
+
+    def hand_keys(self, cards: np.ndarray) -> np.ndarray:
+        # hand_key() of every row of a (hands x 5) array of card bytes at once
+        digits = self._digits[cards]
+        rows = np.arange(cards.shape[0])
+        counts = np.zeros((cards.shape[0], len(self.labels)), dtype=np.int64)
+        for column in range(CARDS_PER_HAND):
+            counts[rows, digits[:, column]] += 1
+        wildcards = counts[:, self._is_wildcard].sum(axis=1)
+        counts[:, self._is_wildcard] = 0
+        counts.sort(axis=1)
+        keys = self._types[counts[:, -1] + wildcards, counts[:, -2]]
+        for column in range(CARDS_PER_HAND):
+            keys = keys * len(self.labels) + digits[:, column]
+        return keys
+
+    def total_winnings(self, hands: np.ndarray) -> int:
+        order = np.argsort(self.hand_keys(hands["cards"]), kind="stable")
+        ranks = np.arange(1, len(hands) + 1, dtype=np.int64)
+        return int((hands["bid"][order] * ranks).sum())
+
+
+CLASSIC_RULES = CardRules("23456789TJQKA")
+JOKER_RULES = CardRules("J23456789TQKA", "J")
+
+
+def load_hands(file_path: str, chunk_size: int = 1 << 16) -> np.ndarray:
+    # reads "32T3K 765" lines into a HAND_DTYPE array, holding at most a chunk of lines at a time
+    chunks = []
+    chunk = np.zeros(chunk_size, dtype=HAND_DTYPE)
+    filled = 0
+    with open(file_path, "rb") as file:
+        for line in file:
+            parts = line.split()
+            if not parts:
+                continue
+            chunk["cards"][filled] = np.frombuffer(parts[0], dtype=np.uint8)
+            chunk["bid"][filled] = int(parts[1])
+            filled += 1
+            if filled == chunk_size:
+                chunks.append(chunk)
+                chunk = np.zeros(chunk_size, dtype=HAND_DTYPE)
+                filled = 0
+    chunks.append(chunk[:filled])
+    return np.concatenate(chunks)
+
+
+def hands_from_lines(lines: str) -> np.ndarray:
+    pairs = [line.split() for line in lines.split("\n") if line.strip()]
+    hands = np.zeros(len(pairs), dtype=HAND_DTYPE)
+    for i, (cards_str, bid) in enumerate(pairs):
+        hands["cards"][i] = np.frombuffer(cards_str.encode(), dtype=np.uint8)
+        hands["bid"][i] = int(bid)
+    return hands
+
+
+def test_rules():
+    hands = hands_from_lines("""
+32T3K 765
+T55J5 684
+KK677 28
+KTJJT 220
+QQQJA 483
+    """)
+    assert CLASSIC_RULES.total_winnings(hands) == 6440
+    assert JOKER_RULES.total_winnings(hands) == 5905
+    for rules in [CLASSIC_RULES, JOKER_RULES]:
+        assert rules.hand_keys(hands["cards"]).tolist() == [
+            rules.hand_key(bytes(c).decode()) for c in hands["cards"]]
+    # 2s are wild as well: the pair of 32T3K becomes three of a kind
+    wild_twos = CardRules("J23456789TQKA", "J2")
+    types = (wild_twos.hand_keys(hands["cards"]) // wild_twos.type_weight).tolist()
+    assert types == [3, 5, 2, 5, 5]
+    # 14 labels: in base 13 "KA234" and "A1234" would get the same key
+    with_ones = CardRules("123456789TJQKA")
+    cards = ["A1234", "KA234", "AAAA1", "1AAAA", "KKKKQ"]
+    assert sorted(cards, key=with_ones.hand_key) == ["KA234", "A1234", "1AAAA", "KKKKQ", "AAAA1"]
+    assert with_ones.hand_key("KA234") < with_ones.hand_key("A1234")
+    keys = with_ones.hand_keys(np.array([np.frombuffer(c.encode(), dtype=np.uint8) for c in cards]))
+    assert keys.tolist() == [with_ones.hand_key(c) for c in cards]
+
+
+def test_all():
+    test_rules()
+
+
+def solve():
+    hands = load_hands("/Users/andreisitaev/Downloads/input_d7_1.txt")
+    for name, rules in [("classic", CLASSIC_RULES), ("jokers", JOKER_RULES)]:
+        print(f"Total bid ({name}): {rules.total_winnings(hands)}")
+
+
+if __name__ == "__main__":
+    solve()
@@ -1,6 +1,8 @@
 import math
 from functools import reduce
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 
 class MapNode:
@@ -60,6 +62,185 @@ class RlMap:
 
         return rl_map
 
+    @classmethod
+    def parse_str(cls, text: str) -> "RlMap":
+        rl_map = cls()
+        lines = [l.strip() for l in text.split("\n") if l.strip()]
+        rl_map.path = lines[0]
+        for line in lines[1:]:
+            name, l_r = line.split(' = ')
+            l, r = l_r.strip('()').split(', ')
+            rl_map.nodes[name] = MapNode(name, l, r)
+        return rl_map
+
+
+class GhostCycle:
+    """
+    when a ghost stands on a Z node: at the steps in "prefix" (before the cycle)
+    and at every step s >= start where s % length is one of "residues"
+    """
+
+    def __init__(self, prefix: List[int], start: int, length: int, residues: List[int]):
+        self.prefix = prefix
+        self.start = start
+        self.length = length
+        self.residues = residues
+
+    def __str__(self) -> str:
+        return f"prefix: {self.prefix}, from {self.start} every {self.length} at {self.residues}"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def is_z_at(self, step: int) -> bool:
+        if step < self.start:
+            return step in self.prefix
+        return step % self.length in self.residues
+
+
+class Navigator:
+    """
+    node names are interned to ints, a full pass over the instructions is precomputed as
+    a jump table for all the nodes at once, and so are 2, 4, 8... passes (binary lifting)
+    """
+
+    def __init__(self, rl_map: RlMap):
+        self.path = rl_map.path
+        self.names: List[str] = list(rl_map.nodes)
+        self.index: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        self.left = np.array([self.index[rl_map.nodes[n].l] for n in self.names], dtype=np.int64)
+        self.right = np.array([self.index[rl_map.nodes[n].r] for n in self.names], dtype=np.int64)
+        self.is_z = np.array([n.endswith("Z") for n in self.names])
+
+        # jumps[k][node] - where the node leads in 2^k passes
+        pass_jump = np.arange(len(self.names))
+        for step_code in self.path:
+            pass_jump = self.left[pass_jump] if step_code == "L" else self.right[pass_jump]
+        self.jumps: List[np.ndarray] = [pass_jump]
+        self._z_offsets: Dict[int, List[int]] = {}
+
+    def position_after(self, node: int, steps: int) -> int:
+        passes, rest = divmod(steps, len(self.path))
+        level = 0
+        while passes:
+            if level == len(self.jumps):
+                self.jumps.append(self.jumps[-1][self.jumps[-1]])
+            if passes & 1:
+                node = int(self.jumps[level][node])
+            passes >>= 1
+            level += 1
+        for step_code in self.path[:rest]:
+            node = int(self.left[node] if step_code == "L" else self.right[node])
+        return node
+
+    def z_offsets(self, start: int) -> List[int]:
+        # steps within a pass started at the node when the ghost stands on a Z node
+        if start not in self._z_offsets:
+            offsets = []
+            node = start
+            for offset, step_code in enumerate(self.path):
+                if self.is_z[node]:
+                    offsets.append(offset)
+                node = int(self.left[node] if step_code == "L" else self.right[node])
+            self._z_offsets[start] = offsets
+        return self._z_offsets[start]
+
+    def find_cycle(self, start: int) -> GhostCycle:
+        # the nodes at the pass boundaries repeat after at most len(nodes) passes
+        ln = len(self.path)
+        seen: Dict[int, int] = {}
+        boundaries: List[int] = []
+        node = start
+        while node not in seen:
+            seen[node] = len(boundaries)
+            boundaries.append(node)
+            node = int(self.jumps[0][node])
+        mu = seen[node]
+        cycle_passes = len(boundaries) - mu
+
+        prefix = [i * ln + o for i in range(mu) for o in self.z_offsets(boundaries[i])]
+        residues = [(i * ln + o) % (cycle_passes * ln)
+                    for i in range(mu, len(boundaries)) for o in self.z_offsets(boundaries[i])]
+        return GhostCycle(prefix, mu * ln, cycle_passes * ln, sorted(set(residues)))
+
+    def solve(self, starts: Optional[List[int]] = None) -> Optional[int]:
+        """
+        the first step when all the ghosts stand on Z nodes. Steps before all the ghosts
+        are in their cycles are checked one by one, the rest is a system of congruences
+        """
+        if starts is None:
+            starts = [i for i, n in enumerate(self.names) if n.endswith("A")]
+        cycles = [self.find_cycle(s) for s in starts]
+        first_cycle_step = max(c.start for c in cycles)
+
+        # all the steps of the first ghost before first_cycle_step
+        first = cycles[0]
+        candidates = list(first.prefix)
+        for base in range(first.start, first_cycle_step, first.length):
+            candidates += [base + (r - base) % first.length for r in first.residues]
+        for step in sorted(candidates):
+            if step < first_cycle_step and all(c.is_z_at(step) for c in cycles):
+                return step
+
+        best = None
+        combinations: List[Tuple[int, int]] = [(0, 1)]
+        for c in cycles:
+            combinations = [crt for r0, m0 in combinations for r in c.residues
+                            if (crt := combine_congruences(r0, m0, r, c.length)) is not None]
+        for r, m in combinations:
+            step = first_cycle_step + (r - first_cycle_step) % m
+            if best is None or step < best:
+                best = step
+        return best
+
+
+def combine_congruences(r1: int, m1: int, r2: int, m2: int) -> Optional[Tuple[int, int]]:
+    # x = r1 (mod m1), x = r2 (mod m2) -> x = r (mod lcm), None if there's no solution
+    g = math.gcd(m1, m2)
+    if (r2 - r1) % g:
+        return None
+    lcm = m1 // g * m2
+    k = ((r2 - r1) // g * pow(m1 // g, -1, m2 // g)) % (m2 // g) if m2 // g > 1 else 0
+    return (r1 + k * m1) % lcm, lcm
+
+
+def test_navigator():
+    rl_map = RlMap.parse_str("""
+LR
+
+11A = (11B, XXX)
+11B = (XXX, 11Z)
+11Z = (11B, XXX)
+22A = (22B, XXX)
+22B = (22C, 22C)
+22C = (22Z, 22Z)
+22Z = (22B, 22B)
+XXX = (XXX, XXX)
+    """)
+    navigator = Navigator(rl_map)
+    assert navigator.solve() == rl_map.solve_map() == 6
+    assert navigator.names[navigator.position_after(navigator.index["22A"], 6)] == "22Z"
+
+    # the first Z is not the cycle length: Z at 2, 4, 6... and at 1, 4, 7... - LCM(2, 1) is wrong
+    rl_map = RlMap.parse_str("""
+L
+
+1A = (1B, 1B)
+1B = (1Z, 1Z)
+1Z = (1B, 1B)
+2A = (2Z, 2Z)
+2Z = (2B, 2B)
+2B = (2C, 2C)
+2C = (2Z, 2Z)
+    """)
+    assert Navigator(rl_map).solve() == 4
+    assert combine_congruences(2, 4, 3, 6) is None
+    assert combine_congruences(1, 4, 3, 6) == (9, 12)
+
+
+def test_all():
+    test_navigator()
+
 
 if __name__ == "__main__":
     rl_map = RlMap.parse_file("/Users/andreisitaev/Downloads/input_d8_1.txt")
@@ -1,4 +1,7 @@
-from typing import List
+from math import comb
+from typing import Dict, List, Tuple
+
+import numpy as np
 
 
 def read_sequences(f_path: str) -> List[List[int]]:
@@ -25,6 +28,74 @@ class SeqSolver:
             seq = difs
 
 
+def read_sequence_arrays(f_path: str) -> Dict[int, np.ndarray]:
+    # sequence length -> (sequences x length) array, int64 or object (Python ints) if the values don't fit
+    with open(f_path, 'r') as file:
+        lines = [line.split() for line in file if line.strip()]
+    lengths = np.array([len(line) for line in lines], dtype=np.int64)
+    tokens = [token for line in lines for token in line]
+    try:
+        values = np.array(tokens, dtype=np.int64)
+    except OverflowError:
+        values = np.array([int(t) for t in tokens], dtype=object)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return {int(ln): values[starts[lengths == ln][:, None] + np.arange(ln)] for ln in np.unique(lengths)}
+
+
+def extrapolation_weights(length: int) -> Tuple[List[int], List[int]]:
+    """
+    the difference triangle of n values is the same as fitting a polynomial of degree n - 1,
+    so the next and the previous values are fixed linear combinations of the sequence:
+    next = sum((-1)^(n-1-i) * C(n, i) * a_i), prev = sum((-1)^i * C(n, i+1) * a_i)
+    """
+    next_weights = [(-1) ** (length - 1 - i) * comb(length, i) for i in range(length)]
+    prev_weights = [(-1) ** i * comb(length, i + 1) for i in range(length)]
+    return next_weights, prev_weights
+
+
+def extrapolate_batch(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # the next and the previous values of all the rows (sequences of the same length) at once
+    length = rows.shape[1]
+    next_weights, prev_weights = extrapolation_weights(length)
+    # |sum| <= max|a| * 2^n and the weights alone are up to 2^n,
+    # past int64 the rows are multiplied as Python ints
+    if rows.dtype == object or max(int(np.abs(rows).max(initial=0)), 1) << length >= 2 ** 63:
+        rows = rows.astype(object)
+        return rows.dot(np.array(next_weights, dtype=object)), rows.dot(np.array(prev_weights, dtype=object))
+    return rows @ np.array(next_weights, dtype=np.int64), rows @ np.array(prev_weights, dtype=np.int64)
+
+
+def extrapolate_file(f_path: str) -> Tuple[int, int]:
+    # sums of the next and of the previous values of all the sequences in the file
+    next_sum, prev_sum = 0, 0
+    for rows in read_sequence_arrays(f_path).values():
+        next_values, prev_values = extrapolate_batch(rows)
+        next_sum += int(next_values.sum())
+        prev_sum += int(prev_values.sum())
+    return next_sum, prev_sum
+
+
+def test_extrapolate_batch():
+    rows = np.array([[0, 3, 6, 9, 12, 15], [1, 3, 6, 10, 15, 21], [10, 13, 16, 21, 30, 45]])
+    next_values, prev_values = extrapolate_batch(rows)
+    assert next_values.tolist() == [18, 28, 68]
+    assert prev_values.tolist() == [-3, 0, 5]
+    assert prev_values.tolist() == [SeqSolver(r).solve() for r in rows.tolist()]
+    # doesn't fit int64: 2^60 * (i + 1) and a binomial weight of 64
+    big = np.array([[2 ** 60 * (i + 1) for i in range(64)]], dtype=object)
+    next_values, prev_values = extrapolate_batch(big)
+    assert next_values.tolist() == [2 ** 60 * 65] and prev_values.tolist() == [0]
+    wide = np.array([[i * i for i in range(70)]], dtype=np.int64)
+    assert extrapolate_batch(wide)[0].tolist() == [70 * 70]
+    # the values are small, the weights are not
+    zeros = np.zeros((2, 67), dtype=np.int64)
+    assert [v.tolist() for v in extrapolate_batch(zeros)] == [[0, 0], [0, 0]]
+
+
+def test_all():
+    test_extrapolate_batch()
+
+
 if __name__ == "__main__":
     sqs = read_sequences("/Users/andreisitaev/Downloads/input_d9_1.txt")
     total_sum = 0
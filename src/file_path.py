@@ -1,13 +1,41 @@
+import datetime
+import hashlib
+import mmap
 import os
+import pickle
+from array import array
 from contextlib import contextmanager
-from typing import Generator, List
+from typing import Any, Callable, Generator, Iterator, List, Optional, Union
 
-BASE_PATH = "/Users/andreisitaev/sources/andrei/aoc_2023/data"
+import numpy as np
+
+# the data folder could be set with AOC_DATA_PATH, defaults to the "data" folder of the repo
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_PATH = os.environ.get("AOC_DATA_PATH", os.path.join(REPO_PATH, "data"))
+# parsed inputs are pickled here, see cached_parse()
+CACHE_PATH = os.environ.get("AOC_CACHE_PATH", os.path.join(REPO_PATH, ".cache"))
+
+WHITESPACE = b" \t\r\n"
+
+
+def set_base_path(base_path: str) -> None:
+    global BASE_PATH
+    BASE_PATH = base_path
+
+
+def set_cache_path(cache_path: str) -> None:
+    global CACHE_PATH
+    CACHE_PATH = cache_path
+
+
+def data_path(file_name: str, base_path: Optional[str] = None) -> str:
+    # absolute paths are left as they are
+    return os.path.join(base_path or BASE_PATH, file_name)
 
 
 @contextmanager
 def open_file(file_name: str) -> Generator:
-    f = open(os.path.join(BASE_PATH, file_name))
+    f = open(data_path(file_name))
     try:
         yield f
     finally:
@@ -15,8 +43,253 @@ def open_file(file_name: str) -> Generator:
 
 
 def read_lines(file_name: str) -> List[str]:
-    with open_file(os.path.join(BASE_PATH, file_name)) as f:
+    with open_file(file_name) as f:
         lines = f.readlines()
         lines = [l.strip() for l in lines]
         lines = [l for l in lines if l]
     return lines
+
+
+def map_file(file_name: str) -> Union[mmap.mmap, bytes]:
+    """
+    map the whole file into memory (read only). mmap refuses to map 0 bytes,
+    so an empty file is returned as an empty bytes object
+    """
+    with open(data_path(file_name), "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        # the mapping keeps its own handle, so the file could be closed right away
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _strip_span(buffer: bytes, start: int, end: int) -> tuple[int, int]:
+    while start < end and buffer[start] in WHITESPACE:
+        start += 1
+    while end > start and buffer[end - 1] in WHITESPACE:
+        end -= 1
+    return start, end
+
+
+def iter_line_spans(buffer) -> Iterator[memoryview]:
+    """
+    yield stripped, non-empty lines of the buffer as memoryview slices
+    (no bytes are copied), i.e. the zero-copy version of read_lines
+    """
+    view = memoryview(buffer)
+    size = len(view)
+    start = 0
+    while start < size:
+        end = buffer.find(b"\n", start)
+        if end < 0:
+            end = size
+        a, b = _strip_span(buffer, start, end)
+        if a < b:
+            yield view[a:b]
+        start = end + 1
+
+
+class MappedLines:
+    """
+    random access to the stripped, non-empty lines of a memory-mapped file:
+    only the (start, end) offsets of every line are stored, lines themselves
+    are sliced from the mapping on demand
+
+        lines = MappedLines("input_d22.txt")
+        bytes(lines[0]), len(lines)
+    """
+
+    def __init__(self, file_name: str):
+        self.buffer = map_file(file_name)
+        self.starts = array("Q")
+        self.ends = array("Q")
+        self._index_lines()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> memoryview:
+        return memoryview(self.buffer)[self.starts[index]:self.ends[index]]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        return iter_line_spans(self.buffer)
+
+    def decode(self, index: int) -> str:
+        return self.buffer[self.starts[index]:self.ends[index]].decode()
+
+    def _index_lines(self) -> None:
+        size = len(self.buffer)
+        start = 0
+        while start < size:
+            end = self.buffer.find(b"\n", start)
+            if end < 0:
+                end = size
+            a, b = _strip_span(self.buffer, start, end)
+            if a < b:
+                self.starts.append(a)
+                self.ends.append(b)
+            start = end + 1
+
+
+def file_digest(file_name: str) -> str:
+    buffer = map_file(file_name)
+    try:
+        return hashlib.sha1(buffer).hexdigest()
+    finally:
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+
+
+def _cache_file_path(file_name: str, parser: Callable, version: int) -> str:
+    parser_name = f"{parser.__module__}.{parser.__qualname__}"
+    key = f"{os.path.basename(file_name)}-{file_digest(file_name)}-{parser_name}-v{version}"
+    return os.path.join(CACHE_PATH, key)
+
+
+def cached_parse(file_name: str, parser: Callable[[str], Any], version: int = 1, verbose: bool = False) -> Any:
+    """
+    parser(file_name) with the result stored on disk: the cache key is made of
+    the file content digest, the parser's name and its version, so change the
+    version whenever the parser's output changes. Numpy arrays are stored as .npy,
+    anything else is pickled
+    """
+    started = datetime.datetime.now()
+    path = _cache_file_path(file_name, parser, version)
+    source = "cache"
+    if os.path.exists(path + ".npy"):
+        parsed = np.load(path + ".npy")
+    elif os.path.exists(path + ".pickle"):
+        with open(path + ".pickle", "rb") as f:
+            parsed = pickle.load(f)
+    else:
+        source = "parser"
+        parsed = parser(file_name)
+        _store_parsed(path, parsed)
+
+    if verbose:
+        elapsed = (datetime.datetime.now() - started).total_seconds()
+        print(f"{file_name} loaded from {source} in {elapsed:.4f} seconds")
+    return parsed
+
+
+def _store_parsed(path: str, parsed: Any) -> None:
+    os.makedirs(CACHE_PATH, exist_ok=True)
+    # write to a temp file first, so a concurrent reader never sees half of the file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if isinstance(parsed, np.ndarray):
+        with open(tmp_path, "wb") as f:
+            np.save(f, parsed)
+        os.replace(tmp_path, path + ".npy")
+        return
+    with open(tmp_path, "wb") as f:
+        pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path + ".pickle")
+
+
+def clear_cache(file_name: str, parser: Callable, version: int = 1) -> None:
+    path = _cache_file_path(file_name, parser, version)
+    for ext in [".npy", ".pickle"]:
+        if os.path.exists(path + ext):
+            os.remove(path + ext)
+
+
+def report_load_times(file_name: str, parser: Callable[[str], Any], version: int = 1) -> tuple[float, float]:
+    # parse the file ignoring the cache (cold), then load it again from the cache (warm)
+    clear_cache(file_name, parser, version)
+    timings = []
+    for _ in range(2):
+        started = datetime.datetime.now()
+        cached_parse(file_name, parser, version, verbose=True)
+        timings.append((datetime.datetime.now() - started).total_seconds())
+    cold, warm = timings
+    print(f"{file_name}: cold load {cold:.4f} s, warm load {warm:.4f} s")
+    return cold, warm
+
+
+def read_grid(file_name: str) -> np.ndarray:
+    """
+    2-D uint8 view over a memory-mapped rectangular grid file (one row per
+    line, "\n" or "\r\n" endings). The array shares memory with the mapping,
+    nothing is copied; the mapping lives as long as the array does
+    """
+    buffer = map_file(file_name)
+    size = len(buffer)
+    # ignore the trailing line breaks / blank lines
+    while size and buffer[size - 1] in WHITESPACE:
+        size -= 1
+    if not size:
+        return np.zeros((0, 0), dtype=np.uint8)
+
+    w = buffer.find(b"\n")
+    if w < 0 or w >= size:
+        w = size
+    row_stride = w + 1
+    if w and buffer[w - 1] == ord("\r"):
+        w -= 1
+    h = (size + row_stride - w) // row_stride
+    if (h - 1) * row_stride + w != size:
+        raise ValueError(f"{file_name} is not a rectangular grid")
+
+    flat = np.frombuffer(buffer, dtype=np.uint8)
+    return np.lib.stride_tricks.as_strided(flat, shape=(h, w), strides=(row_stride, 1), writeable=False)
+
+
+def test_read_grid():
+    import tempfile
+
+    global BASE_PATH
+    base_path = BASE_PATH
+    with tempfile.TemporaryDirectory() as folder:
+        BASE_PATH = folder
+        try:
+            for eol in ["\n", "\r\n"]:
+                with open(os.path.join(folder, "grid.txt"), "w", newline="") as f:
+                    f.write(eol.join(["#.O", "O.#", "..."]) + eol)
+                grid = read_grid("grid.txt")
+                assert grid.shape == (3, 3)
+                assert bytes(grid[1]) == b"O.#"
+                assert bytes(grid[:, 0]) == b"#O."
+
+                lines = MappedLines("grid.txt")
+                assert len(lines) == 3
+                assert bytes(lines[2]) == b"..."
+                assert [bytes(l) for l in lines] == [l.encode() for l in read_lines("grid.txt")]
+        finally:
+            BASE_PATH = base_path
+
+
+def test_cached_parse():
+    import tempfile
+
+    global BASE_PATH, CACHE_PATH
+    base_path, cache_path = BASE_PATH, CACHE_PATH
+    calls = []
+
+    def parse(file_name: str) -> List[int]:
+        calls.append(file_name)
+        return [int(l) for l in read_lines(file_name)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        BASE_PATH, CACHE_PATH = folder, os.path.join(folder, "cache")
+        try:
+            with open(os.path.join(folder, "numbers.txt"), "w") as f:
+                f.write("1\n2\n")
+            assert cached_parse("numbers.txt", parse) == [1, 2]
+            assert cached_parse("numbers.txt", parse) == [1, 2]
+            assert len(calls) == 1
+            # a new parser version or new file content invalidates the cache
+            assert cached_parse("numbers.txt", parse, version=2) == [1, 2]
+            with open(os.path.join(folder, "numbers.txt"), "w") as f:
+                f.write("3\n")
+            assert cached_parse("numbers.txt", parse) == [3]
+            assert len(calls) == 3
+        finally:
+            BASE_PATH, CACHE_PATH = base_path, cache_path
+
+
+def test_all():
+    test_read_grid()
+    test_cached_parse()
+
+
+if __name__ == "__main__":
+    test_all()
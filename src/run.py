@@ -0,0 +1,519 @@
+"""
+Runs a day's solver and measures every phase of it (parse, build, solve):
+wall clock time, CPU time and peak traced memory. The process' peak RSS is a lifetime
+high-water mark, so it's reported once per run. The results are printed as JSON,
+solvers' own output goes to stderr.
+
+    python -m src.run day 17 --part 2 --input input_d17.txt
+    python -m src.run day 22 --part 1 --input input_d22.txt --input input_d22_small.txt
+    python -m src.run day 22 --part 2 --cache-report
+    python -m src.run list
+"""
+import argparse
+import importlib
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from src.file_path import data_path, report_load_times
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SolverFunc = Callable[[str, "Phases"], Any]
+
+# (day, part) -> (default input, solver)
+SOLVERS: Dict[Tuple[int, int], Tuple[str, SolverFunc]] = {}
+# day -> (module, parser) of the days that go through cached_parse(), see --cache-report
+CACHED_PARSERS: Dict[int, Tuple[str, str]] = {
+    20: ("src.day_20_3", "parse_modules"),
+    22: ("src.day_22_2", "parse_bricks"),
+    23: ("src.day_23_2", "parse_surface"),
+    24: ("src.day_24_2", "parse_stones"),
+}
+
+
+def solver(day: int, part: int, default_input: str) -> Callable[[SolverFunc], SolverFunc]:
+    def register(func: SolverFunc) -> SolverFunc:
+        SOLVERS[(day, part)] = (default_input, func)
+        return func
+
+    return register
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 3)
+
+
+class Phases:
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.records: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Generator:
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        started, started_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                "phase": name,
+                "wall_s": round(time.perf_counter() - started, 6),
+                "cpu_s": round(time.process_time() - started_cpu, 6),
+                "peak_traced_mb": None,
+            }
+            if self.trace_memory:
+                record["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 3)
+            self.records.append(record)
+
+
+def run_solver(day: int, part: int, input_file: Optional[str] = None, trace_memory: bool = True) -> Dict[str, Any]:
+    default_input, func = SOLVERS[(day, part)]
+    input_file = input_file or default_input
+    phases = Phases(trace_memory)
+    result: Dict[str, Any] = {"day": day, "part": part, "input": input_file}
+    try:
+        # solvers print a lot, keep stdout for the JSON report
+        with redirect_stdout(sys.stderr):
+            answer = func(data_path(input_file), phases)
+        result["answer"] = answer if isinstance(answer, (int, str)) or answer is None else str(answer)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    result["phases"] = phases.records
+    result["wall_s"] = round(sum(r["wall_s"] for r in phases.records), 6)
+    result["cpu_s"] = round(sum(r["cpu_s"] for r in phases.records), 6)
+    # ru_maxrss never goes down, it covers the whole process up to this point
+    result["process_peak_rss_mb"] = get_peak_rss_mb()
+    return result
+
+
+def run_cache_report(day: int, input_file: str) -> Dict[str, Any]:
+    module_name, parser_name = CACHED_PARSERS[day]
+    parser = getattr(importlib.import_module(module_name), parser_name)
+    with redirect_stdout(sys.stderr):
+        cold, warm = report_load_times(data_path(input_file), parser)
+    return {"parser": f"{module_name}.{parser_name}", "cold_s": round(cold, 6), "warm_s": round(warm, 6)}
+
+
+@solver(4, 1, "input_d4_1.txt")
+def solve_day_4_1(input_file: str, phases: Phases) -> int:
+    from src.day_4_1 import read_file_lines, score_cards
+
+    with phases.phase("parse"):
+        rows = read_file_lines(input_file)
+    with phases.phase("solve"):
+        return score_cards(rows)
+
+
+@solver(5, 1, "input_d5_1.txt")
+def solve_day_5_1(input_file: str, phases: Phases) -> int:
+    from src.day_5_1 import parse_almanac
+
+    with phases.phase("parse"):
+        almanac = parse_almanac(input_file)
+    with phases.phase("solve"):
+        return almanac.find_min_location()
+
+
+@solver(5, 2, "input_d5_1.txt")
+def solve_day_5_2(input_file: str, phases: Phases) -> int:
+    from src.day_5_2 import parse_almanac
+
+    with phases.phase("parse"):
+        almanac = parse_almanac(input_file)
+    with phases.phase("solve"):
+        return almanac.find_min_location()
+
+
+@solver(6, 1, "input_d6_1.txt")
+def solve_day_6_1(input_file: str, phases: Phases) -> int:
+    from src.day_6_1 import Race
+
+    with phases.phase("parse"):
+        races = Race.parse_file(input_file)
+    with phases.phase("solve"):
+        total = 1
+        for race in races:
+            total *= race.get_win_nums() or 1
+    return total
+
+
+@solver(6, 2, "input_d6_1.txt")
+def solve_day_6_2(input_file: str, phases: Phases) -> int:
+    from src.day_6_2 import Race
+
+    with phases.phase("parse"):
+        races = Race.parse_file(input_file)
+    with phases.phase("solve"):
+        return races[0].get_win_nums()
+
+
+@solver(7, 1, "input_d7_1.txt")
+def solve_day_7_1(input_file: str, phases: Phases) -> int:
+    from src.day_7_1 import Game
+
+    with phases.phase("solve"):
+        return Game(input_file).bid
+
+
+@solver(7, 2, "input_d7_1.txt")
+def solve_day_7_2(input_file: str, phases: Phases) -> int:
+    from src.day_7_2 import Game
+
+    with phases.phase("solve"):
+        return Game(input_file).bid
+
+
+@solver(8, 1, "input_d8_1.txt")
+def solve_day_8_1(input_file: str, phases: Phases) -> int:
+    from src.day_8_1 import RlMap
+
+    with phases.phase("parse"):
+        rl_map = RlMap.parse_file(input_file)
+    with phases.phase("solve"):
+        return rl_map.solve_map()
+
+
+@solver(8, 2, "input_d8_1.txt")
+def solve_day_8_2(input_file: str, phases: Phases) -> int:
+    from src.day_8_2 import RlMap, Navigator
+
+    with phases.phase("parse"):
+        rl_map = RlMap.parse_file(input_file)
+    with phases.phase("index"):
+        navigator = Navigator(rl_map)
+    with phases.phase("solve"):
+        return navigator.solve()
+
+
+@solver(9, 1, "input_d9_1.txt")
+def solve_day_9_1(input_file: str, phases: Phases) -> int:
+    from src.day_9_1 import read_sequence_arrays, extrapolate_batch
+
+    with phases.phase("parse"):
+        batches = read_sequence_arrays(input_file)
+    with phases.phase("solve"):
+        return sum(int(extrapolate_batch(rows)[0].sum()) for rows in batches.values())
+
+
+@solver(9, 2, "input_d9_1.txt")
+def solve_day_9_2(input_file: str, phases: Phases) -> int:
+    from src.day_9_1 import read_sequence_arrays, extrapolate_batch
+
+    with phases.phase("parse"):
+        batches = read_sequence_arrays(input_file)
+    with phases.phase("solve"):
+        return sum(int(extrapolate_batch(rows)[1].sum()) for rows in batches.values())
+
+
+@solver(10, 1, "input_d10.txt")
+def solve_day_10_1(input_file: str, phases: Phases) -> int:
+    from src.day_10_2 import PackedMaze
+
+    with phases.phase("parse"):
+        maze = PackedMaze(input_file)
+    with phases.phase("solve"):
+        maze.trace_loop()
+        return int(maze.distance.max())
+
+
+@solver(10, 2, "input_d10.txt")
+def solve_day_10_2(input_file: str, phases: Phases) -> int:
+    from src.day_10_2 import PackedMaze
+
+    with phases.phase("parse"):
+        maze = PackedMaze(input_file)
+    with phases.phase("solve"):
+        return maze.count_inner_dots()
+
+
+@solver(11, 2, "input_d11.txt")
+def solve_day_11_2(input_file: str, phases: Phases) -> int:
+    from src.day_11_2 import SparseGalaxies
+
+    with phases.phase("parse"):
+        galaxies = SparseGalaxies.from_file(input_file)
+    with phases.phase("solve"):
+        return galaxies.calc_total_distances([1000000])[0]
+
+
+@solver(12, 2, "input_d12.txt")
+def solve_day_12_2(input_file: str, phases: Phases) -> int:
+    from src.day_12_p3 import Sudoku
+
+    with phases.phase("parse"):
+        sudoku = Sudoku(input_file)
+    with phases.phase("solve"):
+        return sudoku.solve()
+
+
+@solver(13, 2, "input_d13.txt")
+def solve_day_13_2(input_file: str, phases: Phases) -> int:
+    from src.day_13_2 import BitPattern
+
+    with phases.phase("parse"):
+        with open(input_file) as f:
+            patterns = [BitPattern(p.split()) for p in f.read().split("\n\n") if p.strip()]
+    with phases.phase("solve"):
+        return sum(pattern.score(1) for pattern in patterns)
+
+
+@solver(14, 1, "input_d14.txt")
+def solve_day_14_1(input_file: str, phases: Phases) -> int:
+    from src.day_14_1 import ControlPanel
+
+    with phases.phase("parse"):
+        panel = ControlPanel(input_file)
+    with phases.phase("solve"):
+        panel._tilt_north()
+        return panel._calc_weight()
+
+
+@solver(14, 2, "input_d14.txt")
+def solve_day_14_2(input_file: str, phases: Phases) -> int:
+    from src.day_14_2 import NumpyPanel
+
+    with phases.phase("parse"):
+        panel = NumpyPanel(input_file)
+    with phases.phase("solve"):
+        return panel.load_after(1000000000)
+
+
+@solver(15, 1, "input_d15.txt")
+def solve_day_15_1(input_file: str, phases: Phases) -> int:
+    from src.day_15_2 import read_steps, bulk_hash
+
+    with phases.phase("parse"):
+        steps = read_steps(input_file)
+    with phases.phase("solve"):
+        return int(bulk_hash(steps).sum(dtype=int))
+
+
+@solver(15, 2, "input_d15.txt")
+def solve_day_15_2(input_file: str, phases: Phases) -> int:
+    from src.day_15_2 import LensBoxes, read_steps
+
+    with phases.phase("parse"):
+        steps = read_steps(input_file)
+    with phases.phase("solve"):
+        boxes = LensBoxes()
+        boxes.run(steps)
+        return boxes.get_total_focus()
+
+
+@solver(16, 1, "input_d16.txt")
+def solve_day_16_1(input_file: str, phases: Phases) -> int:
+    from src.day_16_1 import Machine, Beam
+
+    with phases.phase("parse"):
+        machine = Machine(input_file)
+    with phases.phase("solve"):
+        return machine.trace_and_calc(Beam(0, 0, 1, 0))
+
+
+@solver(17, 1, "input_d17.txt")
+def solve_day_17_1(input_file: str, phases: Phases) -> int:
+    from src.day_17_1_p5 import HeatMap
+
+    with phases.phase("parse"):
+        heat_map = HeatMap(input_file)
+    with phases.phase("solve"):
+        return heat_map.find_way()
+
+
+@solver(17, 2, "input_d17.txt")
+def solve_day_17_2(input_file: str, phases: Phases) -> int:
+    from src.day_17_2 import HeatMap
+
+    with phases.phase("parse"):
+        heat_map = HeatMap(input_file)
+    with phases.phase("solve"):
+        return heat_map.find_way()
+
+
+@solver(18, 1, "input_d18.txt")
+def solve_day_18_1(input_file: str, phases: Phases) -> int:
+    from src.day_18_1 import DigPlan
+
+    with phases.phase("parse"):
+        plan = DigPlan(input_file)
+    with phases.phase("solve"):
+        return round(plan.solve())
+
+
+@solver(18, 2, "input_d18.txt")
+def solve_day_18_2(input_file: str, phases: Phases) -> int:
+    from src.day_18_2 import DigPlan
+
+    with phases.phase("parse"):
+        plan = DigPlan(input_file)
+    with phases.phase("solve"):
+        return round(plan.solve())
+
+
+@solver(19, 1, "input_d19.txt")
+def solve_day_19_1(input_file: str, phases: Phases) -> int:
+    from src.day_19_1 import Pipeline
+
+    with phases.phase("parse"):
+        pipeline = Pipeline(input_file)
+    with phases.phase("solve"):
+        pipeline.run()
+    return pipeline._total_accepted
+
+
+@solver(19, 2, "input_d19.txt")
+def solve_day_19_2(input_file: str, phases: Phases) -> int:
+    from src.day_19_2 import Pipeline
+
+    with phases.phase("parse"):
+        pipeline = Pipeline(input_file)
+    with phases.phase("solve"):
+        return int(pipeline.solve())
+
+
+@solver(20, 2, "input_d20.txt")
+def solve_day_20_2(input_file: str, phases: Phases) -> int:
+    from src.day_20_3 import Circuit
+
+    circuit = Circuit()
+    with phases.phase("parse"):
+        circuit.load_from_file(input_file)
+    with phases.phase("solve"):
+        # rx gets LOW when all the last cascade modules send HIGH at once: the lcm of their periods
+        while any(len(ticks) < 2 for ticks in circuit.module_period.values()):
+            circuit.press_button()
+        periods = [sorted(ticks)[1] - sorted(ticks)[0] for ticks in circuit.module_period.values()]
+        return math.lcm(*periods)
+
+
+@solver(21, 1, "input_d21.txt")
+def solve_day_21_1(input_file: str, phases: Phases) -> int:
+    from src.day_21_1 import FieldMap
+
+    field_map = FieldMap()
+    with phases.phase("parse"):
+        field_map.load_from_file(input_file)
+    with phases.phase("solve"):
+        return field_map.solve()
+
+
+@solver(22, 1, "input_d22.txt")
+def solve_day_22_1(input_file: str, phases: Phases) -> int:
+    from src.day_22_1 import Jenga
+
+    with phases.phase("parse"):
+        jenga = Jenga(input_file)
+    with phases.phase("build"):
+        jenga.zip_bricks()
+    with phases.phase("solve"):
+        return jenga.detect_removable()
+
+
+@solver(22, 2, "input_d22.txt")
+def solve_day_22_2(input_file: str, phases: Phases) -> int:
+    from src.day_22_2 import Jenga
+
+    with phases.phase("parse"):
+        jenga = Jenga(input_file)
+    with phases.phase("build"):
+        jenga.zip_bricks()
+    with phases.phase("solve"):
+        return jenga.calc_max_impact()
+
+
+@solver(23, 2, "input_d23.txt")
+def solve_day_23_2(input_file: str, phases: Phases) -> int:
+    from src.day_23_2 import Island
+
+    with phases.phase("parse"):
+        island = Island(input_file)
+    with phases.phase("solve"):
+        return island.solve()
+
+
+@solver(24, 1, "input_d24.txt")
+def solve_day_24_1(input_file: str, phases: Phases) -> int:
+    from src.day_24_1 import Hail
+
+    with phases.phase("parse"):
+        hail = Hail(input_file)
+    with phases.phase("solve"):
+        return hail.solve()
+
+
+@solver(25, 1, "input_d25.txt")
+def solve_day_25_1(input_file: str, phases: Phases) -> int:
+    from src.day_25.day_25_stoer_wagner import Graph
+
+    graph = Graph()
+    with phases.phase("parse"):
+        graph.load_from_file(input_file)
+    with phases.phase("solve"):
+        _weight, groups = graph.find_min_cut()
+    # "[count_a][count_b]"
+    count_a, count_b = groups.strip("[]").split("][")
+    return int(count_a) * int(count_b)
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m src.run")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="list the registered solvers")
+    day_parser = commands.add_parser("day", help="run a day's solver")
+    day_parser.add_argument("day", type=int)
+    day_parser.add_argument("--part", type=int, default=1)
+    day_parser.add_argument("--input", action="append",
+                            help="input file, absolute or relative to the data folder, could be repeated")
+    day_parser.add_argument("--no-trace-memory", action="store_true",
+                            help="don't use tracemalloc (it slows the solvers down)")
+    day_parser.add_argument("--cache-report", action="store_true",
+                            help="also time the cached parser cold (cache cleared) and warm")
+    day_parser.add_argument("--output", help="write the JSON report to the file instead of stdout")
+    options = parser.parse_args(args)
+
+    if options.command == "list":
+        for (day, part), (default_input, _func) in sorted(SOLVERS.items()):
+            print(f"day {day} part {part}: {default_input}")
+        return
+
+    if (options.day, options.part) not in SOLVERS:
+        parser.error(f"no solver for day {options.day} part {options.part}, see \"list\"")
+    if options.cache_report and options.day not in CACHED_PARSERS:
+        parser.error(f"day {options.day} doesn't use the parse cache")
+    reports = []
+    for input_file in options.input or [SOLVERS[(options.day, options.part)][0]]:
+        report = run_solver(options.day, options.part, input_file, not options.no_trace_memory)
+        if options.cache_report:
+            report["cache_load"] = run_cache_report(options.day, input_file)
+        reports.append(report)
+    report = json.dumps(reports if len(reports) > 1 else reports[0], indent=2)
+    if options.output:
+        with open(options.output, "w") as f:
+            f.write(report + os.linesep)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Deterministic generators of puzzle-like inputs of an arbitrary size, used by the benchmarks.
+The scale is the input size multiplier: for grids the area grows "scale" times,
+for lists (bricks, hailstones, graph nodes, netlist counters) the number of items does.
+"""
+import math
+import os
+import random
+from typing import Callable, Dict, List, Set, Tuple
+
+
+def _grid_side(base_side: int, scale: int) -> int:
+    return max(3, round(base_side * math.sqrt(scale)))
+
+
+def _name(index: int, letters: int = 3) -> str:
+    # 0 -> "aaa", 1 -> "aab", ...
+    chars = []
+    for _ in range(letters):
+        index, rem = divmod(index, 26)
+        chars.append(chr(ord("a") + rem))
+    return "".join(reversed(chars))
+
+
+def generate_maze(scale: int, seed: int = 0) -> str:
+    """
+    day 10: a rectangular pipe loop starting in S, the rest of the tiles are random pipes / ground
+    """
+    rnd = random.Random(seed)
+    side = _grid_side(20, scale)
+    rows = [[rnd.choice("|-LJ7F.") for _ in range(side)] for _ in range(side)]
+    top, left, bottom, right = 1, 1, side - 2, side - 2
+    for x in range(left + 1, right):
+        rows[top][x] = rows[bottom][x] = "-"
+    for y in range(top + 1, bottom):
+        rows[y][left] = rows[y][right] = "|"
+    rows[top][left] = "S"
+    rows[top][right] = "7"
+    rows[bottom][left] = "L"
+    rows[bottom][right] = "J"
+    return "\n".join("".join(r) for r in rows) + "\n"
+
+
+def generate_dish(scale: int, seed: int = 0) -> str:
+    # day 14: round (O) and cube (#) rocks
+    rnd = random.Random(seed)
+    side = _grid_side(10, scale)
+    return "\n".join("".join(rnd.choices(".O#", weights=[6, 3, 1], k=side)) for _ in range(side)) + "\n"
+
+
+def generate_contraption(scale: int, seed: int = 0) -> str:
+    """
+    day 16: a beam entering at (0, 0) to the right snakes through the whole grid: the even rows
+    are lanes joined by mirrors at their ends, with "-" splitters (transparent along the lane) on them.
+    The odd rows are random mirrors and splitters, reached by the beams leaking from the turns
+    """
+    rnd = random.Random(seed)
+    side = max(4, _grid_side(10, scale))
+    rows = []
+    for y in range(side):
+        if y % 2:
+            row = rnd.choices(".|-/\\", weights=[20, 1, 1, 1, 1], k=side)
+            row[0] = row[-1] = "."
+        else:
+            row = rnd.choices(".-", weights=[10, 1], k=side)
+            # lane 0 goes right, lane 1 left, ...
+            going_right = y % 4 == 0
+            if y:
+                row[0 if going_right else -1] = "\\" if going_right else "/"
+            if y + 2 < side:
+                row[-1 if going_right else 0] = "\\" if going_right else "/"
+            row[0] = "." if y == 0 else row[0]
+        rows.append(row)
+    return "\n".join("".join(r) for r in rows) + "\n"
+
+
+def generate_heat_map(scale: int, seed: int = 0) -> str:
+    # day 17: heat loss digits
+    rnd = random.Random(seed)
+    side = _grid_side(8, scale)
+    return "\n".join("".join(rnd.choices("123456789", k=side)) for _ in range(side)) + "\n"
+
+
+def generate_garden(scale: int, seed: int = 0) -> str:
+    # day 21: garden plots with rocks, S in the middle
+    rnd = random.Random(seed)
+    side = _grid_side(11, scale) | 1
+    rows = [rnd.choices(".#", weights=[6, 1], k=side) for _ in range(side)]
+    rows[side // 2][side // 2] = "S"
+    return "\n".join("".join(r) for r in rows) + "\n"
+
+
+def generate_hiking_map(scale: int, seed: int = 0) -> str:
+    """
+    day 23: a serpentine trail from (1, 0) to (w - 2, h - 1) through the forest.
+    The trail has no forks, so the solver's cost is driven by the map size only
+    """
+    rnd = random.Random(seed)
+    side = _grid_side(11, scale)
+    w, h = side | 1, (side | 1) + (2 if (side | 1) % 4 == 1 else 0)
+    rows = [["#"] * w for _ in range(h)]
+    rows[0][1] = "."
+    for y in range(1, h - 1, 2):
+        for x in range(1, w - 1):
+            rows[y][x] = rnd.choice(".....>") if x not in (1, w - 2) else "."
+        # connect to the next lane on the alternating side
+        if y + 2 < h - 1:
+            rows[y + 1][w - 2 if (y // 2) % 2 == 0 else 1] = "."
+    rows[h - 2][w - 2] = "."
+    rows[h - 1][w - 2] = "."
+    return "\n".join("".join(r) for r in rows) + "\n"
+
+
+def generate_hailstones(scale: int, seed: int = 0) -> str:
+    # day 24: "x, y, z @ vx, vy, vz"
+    rnd = random.Random(seed)
+    lines = []
+    for _ in range(30 * scale):
+        p = [rnd.randint(100000000000000, 500000000000000) for _ in range(3)]
+        v = [rnd.randint(-300, 300) or 1 for _ in range(3)]
+        lines.append(f"{p[0]}, {p[1]}, {p[2]} @ {v[0]}, {v[1]}, {v[2]}")
+    return "\n".join(lines) + "\n"
+
+
+def generate_wiring(scale: int, seed: int = 0) -> str:
+    """
+    day 25: two densely connected clusters of components joined by exactly 3 wires
+    """
+    rnd = random.Random(seed)
+    cluster_size = 10 * scale
+    edges: Set[Tuple[str, str]] = set()
+    for cluster in range(2):
+        names = [_name(cluster * cluster_size + i) for i in range(cluster_size)]
+        for i, name in enumerate(names):
+            # a ring keeps the cluster connected, random chords make it dense
+            edges.add((name, names[(i + 1) % cluster_size]))
+            for other in rnd.sample(names, min(4, cluster_size - 1)):
+                if other != name and (other, name) not in edges:
+                    edges.add((name, other))
+    for i in range(3):
+        edges.add((_name(i * 3), _name(cluster_size + i * 3)))
+
+    wires: Dict[str, List[str]] = {}
+    for a, b in sorted(edges):
+        wires.setdefault(a, []).append(b)
+    return "\n".join(f"{a}: {' '.join(b)}" for a, b in wires.items()) + "\n"
+
+
+def generate_netlist(scale: int, seed: int = 0) -> str:
+    """
+    day 20: the broadcaster feeds 4 * scale binary counters built of 12 flip-flops and
+    a conjunction each; the counters' inverters (the first four are named after
+    day_20_3.Circuit.LAST_CASCADE) are joined by &qn -> rx
+    """
+    rnd = random.Random(seed)
+    inverters = ["qz", "cq", "jx", "tt"]
+    counters = 4 * scale
+    lines = []
+    first_flip_flops = []
+    for c in range(counters):
+        bits = [f"f{c}x{i}" for i in range(12)]
+        hub = f"h{c}"
+        inverter = inverters[c] if c < len(inverters) else f"i{c}"
+        period = rnd.randint(2 ** 11 + 1, 2 ** 12 - 1) | 1
+        hub_outputs = [bits[0], inverter]
+        for i, bit in enumerate(bits):
+            outputs = [bits[i + 1]] if i + 1 < len(bits) else []
+            if period >> i & 1:
+                outputs.append(hub)
+            elif i:
+                hub_outputs.append(bit)
+            lines.append(f"%{bit} -> {', '.join(outputs or [hub])}")
+        lines.append(f"&{hub} -> {', '.join(hub_outputs)}")
+        lines.append(f"&{inverter} -> qn")
+        first_flip_flops.append(bits[0])
+    lines.append(f"broadcaster -> {', '.join(first_flip_flops)}")
+    lines.append("&qn -> rx")
+    return "\n".join(lines) + "\n"
+
+
+def generate_bricks(scale: int, seed: int = 0) -> str:
+    # day 22: "x1,y1,z1~x2,y2,z2" bricks, stretched along one of the axes
+    rnd = random.Random(seed)
+    lines = []
+    for _ in range(100 * scale):
+        x, y, z = rnd.randint(0, 9), rnd.randint(0, 9), rnd.randint(1, 3 * scale + 10)
+        length = rnd.randint(0, 3)
+        axis = rnd.randint(0, 2)
+        end = [x, y, z]
+        end[axis] += length
+        end[0], end[1] = min(end[0], 9), min(end[1], 9)
+        lines.append(f"{x},{y},{z}~{end[0]},{end[1]},{end[2]}")
+    return "\n".join(lines) + "\n"
+
+
+GENERATORS: Dict[str, Callable[[int, int], str]] = {
+    "maze": generate_maze,
+    "dish": generate_dish,
+    "contraption": generate_contraption,
+    "heat_map": generate_heat_map,
+    "garden": generate_garden,
+    "hiking_map": generate_hiking_map,
+    "hailstones": generate_hailstones,
+    "wiring": generate_wiring,
+    "netlist": generate_netlist,
+    "bricks": generate_bricks,
+}
+
+
+def write_input(folder: str, kind: str, scale: int, seed: int = 0) -> str:
+    file_path = os.path.join(folder, f"synthetic_{kind}_x{scale}.txt")
+    with open(file_path, "w") as f:
+        f.write(GENERATORS[kind](scale, seed))
+    return file_path
+
+
+def test_generators_are_deterministic():
+    for kind, generator in GENERATORS.items():
+        assert generator(1, 1) == generator(1, 1), kind
+        assert len(generator(10, 1)) > len(generator(1, 1)), kind
+
+
+def test_all():
+    test_generators_are_deterministic()
+
+
+if __name__ == "__main__":
+    test_all()